@@ -9,9 +9,10 @@ class InvalidParamError(HttpClientError):
 
 
 class TimeoutError(HttpClientError):
-    def __init__(self, message="Request timed out"):
+    def __init__(self, message="Request timed out", phase=None):
         super().__init__(message)
         self.message = message
+        self.phase = phase
 
 
 class ConnectionError(HttpClientError):
@@ -30,3 +31,9 @@ class ResponseDecodeError(HttpClientError):
     def __init__(self, message="Failed to decode response"):
         super().__init__(message)
         self.message = message
+
+
+class EntityChangedError(ConnectionError):
+    def __init__(self, message="The resource changed during the download"):
+        super().__init__(message)
+        self.message = message
@@ -1,16 +1,32 @@
 import typer
+import contextlib
+import json
 import os
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated
+from urllib.parse import urlparse
 
 from exceptions import InvalidParamError
 from requests.get import http_get
 from requests.post import http_post
 from requests.put import http_put
 from requests.delete import http_delete
+from requests.timeouts import Timeout
+from requests.metrics import MetricsCollector
+from requests.download import download as download_file, DEFAULT_CONNECTIONS
 
 DESCRIPTION = ('Usage: python main.py [request method] <url> [options...] [headers] [timeout]\n headers: '
                '"header;header..." \n\n get: HTTP Get --params \n post: HTTP Post --data \n put: HTTP Put --data \n '
                'delete HTTP Delete')
 
+OUTPUT_DIR = 'html'
+BATCH_WORKERS = 8
+BATCH_PER_HOST = 4
+COUNTER_FILE = '.next_index'
+
 app = typer.Typer()
 
 
@@ -20,7 +36,9 @@ def help():
 
 
 @app.command()
-def get(url: str, headers=None, cookies=None, save: bool = False, timeout=1000):
+def get(url: str, headers=None, cookies=None, save: bool = False, timeout=1000, fsync: bool = False,
+        output_dir: str = OUTPUT_DIR,
+        write_out: Annotated[str, typer.Option('--write-out', '-w')] = None):
     if headers is not None:
         headers = param_str_to_dict(headers.strip())
     else:
@@ -29,15 +47,20 @@ def get(url: str, headers=None, cookies=None, save: bool = False, timeout=1000):
         cookies = param_str_to_dict(cookies.strip())
     else:
         cookies = {}
-    response = http_get(url, cookies, headers, int(timeout))
+    response = http_get(url, cookies, headers, int(timeout), stream=save)
     if save:
-        save_response_as_html(response)
+        save_response_as_html(response, fsync, output_dir)
     print(response.status_code)
+    if write_out:
+        print(response.timings.format(write_out), end='')
     return response
 
 
 @app.command()
-def post(url: str, data=None, headers=None, cookies=None, save: bool = False, timeout=1000):
+def post(url: str, data=None, headers=None, cookies=None, save: bool = False, timeout=1000, fsync: bool = False,
+        output_dir: str = OUTPUT_DIR,
+        write_out: Annotated[str, typer.Option('--write-out', '-w')] = None,
+        compress: str = None, upload_file: str = None):
     if headers is not None:
         headers = param_str_to_dict(headers)
     else:
@@ -46,15 +69,21 @@ def post(url: str, data=None, headers=None, cookies=None, save: bool = False, ti
         cookies = param_str_to_dict(cookies)
     else:
         cookies = {}
-    response = http_post(url, data, headers, cookies, int(timeout))
+    with open_body(data, upload_file) as body:
+        response = http_post(url, body, headers, cookies, int(timeout), stream=save, compress=compress)
     if save:
-        save_response_as_html(response)
+        save_response_as_html(response, fsync, output_dir)
     print(response.status_code)
+    if write_out:
+        print(response.timings.format(write_out), end='')
     return response
 
 
 @app.command()
-def put(url: str, data=None, headers=None, cookies=None, save: bool = False, timeout=1000):
+def put(url: str, data=None, headers=None, cookies=None, save: bool = False, timeout=1000, fsync: bool = False,
+        output_dir: str = OUTPUT_DIR,
+        write_out: Annotated[str, typer.Option('--write-out', '-w')] = None,
+        compress: str = None, upload_file: str = None):
     if headers is not None:
         headers = param_str_to_dict(headers)
     else:
@@ -63,15 +92,20 @@ def put(url: str, data=None, headers=None, cookies=None, save: bool = False, tim
         cookies = param_str_to_dict(cookies)
     else:
         cookies = {}
-    response = http_put(url, data, headers, cookies, int(timeout))
+    with open_body(data, upload_file) as body:
+        response = http_put(url, body, headers, cookies, int(timeout), stream=save, compress=compress)
     if save:
-        save_response_as_html(response)
+        save_response_as_html(response, fsync, output_dir)
     print(response.status_code)
+    if write_out:
+        print(response.timings.format(write_out), end='')
     return response
 
 
 @app.command()
-def delete(url: str, headers=None, cookies=None, save: bool = False, timeout=1000):
+def delete(url: str, headers=None, cookies=None, save: bool = False, timeout=1000, fsync: bool = False,
+        output_dir: str = OUTPUT_DIR,
+        write_out: Annotated[str, typer.Option('--write-out', '-w')] = None):
     if headers is not None:
         headers = param_str_to_dict(headers)
     else:
@@ -80,26 +114,189 @@ def delete(url: str, headers=None, cookies=None, save: bool = False, timeout=100
         cookies = param_str_to_dict(cookies)
     else:
         cookies = {}
-    response = http_delete(url, headers, cookies, int(timeout))
+    response = http_delete(url, headers, cookies, int(timeout), stream=save)
     if save:
-        save_response_as_html(response)
+        save_response_as_html(response, fsync, output_dir)
     print(response.status_code)
+    if write_out:
+        print(response.timings.format(write_out), end='')
     return response
 
 
-def count_files(directory):
-    return len([file for file in os.listdir(directory) if os.path.isfile(os.path.join(directory, file))])
+@app.command()
+def download(url: str, path: str, headers=None, connections: int = DEFAULT_CONNECTIONS, mmap: bool = False,
+             timeout=1000, fsync: bool = False, resume: bool = True):
+    if headers is not None:
+        headers = param_str_to_dict(headers)
+    else:
+        headers = {}
+    size = download_file(url, path, connections, headers, int(timeout), use_mmap=mmap, fsync=fsync, resume=resume)
+    print(f"Сохранено в файл: {path} ({size} байт)")
+    return size
+
+
+@app.command()
+def batch(input: str = '-', output: str = '-', workers: int = BATCH_WORKERS, per_host: int = BATCH_PER_HOST,
+          timeout=1000, total_timeout: float = None, metrics: str = None):
+    source = sys.stdin if input == '-' else open(input, encoding='utf-8')
+    target = sys.stdout if output == '-' else open(output, 'w', encoding='utf-8')
+    collector = MetricsCollector().attach() if metrics else None
+    try:
+        run_batch(source, target, workers, per_host, Timeout(int(timeout), int(timeout), int(timeout),
+                                                             total=total_timeout))
+    finally:
+        if collector is not None:
+            collector.detach()
+            collector.write(metrics)
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+
+def run_batch(lines, target, workers=BATCH_WORKERS, per_host=BATCH_PER_HOST, timeout=1000):
+    # Results are written as each request finishes, so they carry the input line index.
+    # A request over its host's limit waits in that host's queue, not in a worker, so
+    # one busy host never holds workers that requests to other hosts could use.
+    write_lock = threading.Lock()
+    state = threading.Condition()
+    active = {}
+    queued = {}
+    unfinished = 0
+
+    def run(index, line, request, host):
+        result = {'index': index}
+        try:
+            # An unreadable line is parsed again here so that its error is reported.
+            request = json.loads(line) if request is None else request
+            result['method'] = request.get('method', 'GET').upper()
+            result['url'] = request['url']
+            response = send_batch_request(request, timeout)
+            result['status_code'] = response.status_code
+            result['headers'] = response.headers
+            result['body'] = response.text
+        except Exception as e:
+            result['error'] = str(e) or type(e).__name__
+        try:
+            with write_lock:
+                target.write(json.dumps(result, ensure_ascii=False) + '\n')
+                target.flush()
+        finally:
+            finished(host)
+
+    def start(index, line, request, host):
+        active[host] = active.get(host, 0) + 1
+        executor.submit(run, index, line, request, host)
+
+    def finished(host):
+        nonlocal unfinished
+        with state:
+            active[host] -= 1
+            if queued.get(host):
+                start(*queued[host].popleft())
+            unfinished -= 1
+            state.notify_all()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for index, line in enumerate(lines):
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                host = urlparse(request['url']).netloc
+            except Exception:
+                request, host = None, None
+            with state:
+                unfinished += 1
+                if active.get(host, 0) < per_host:
+                    start(index, line, request, host)
+                else:
+                    queued.setdefault(host, deque()).append((index, line, request, host))
+        # Queued requests are submitted as others finish, so the executor must stay open until then.
+        with state:
+            while unfinished:
+                state.wait()
 
-def save_response_as_html(response):
-    if not os.path.exists('html'):
-        os.makedirs('html')
 
-    filename = f'html/saved_contents{count_files("html")}.html'
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(response.get_content())
+def send_batch_request(request, timeout):
+    method = request.get('method', 'GET').upper()
+    url = request['url']
+    headers = request.get('headers') or {}
+    cookies = request.get('cookies') or {}
+    data = request.get('data', request.get('body'))
+    compress = request.get('compress')
+    if method == 'GET':
+        return http_get(url, headers, cookies, timeout)
+    if method == 'POST':
+        return http_post(url, data, headers, cookies, timeout, compress=compress)
+    if method == 'PUT':
+        return http_put(url, data, headers, cookies, timeout, compress=compress)
+    if method == 'DELETE':
+        return http_delete(url, headers, cookies, timeout)
+    raise InvalidParamError(f"Unsupported method: {method}")
+
+
+def saved_file_path(directory, index):
+    return os.path.join(directory, f'saved_contents{index}.html')
+
+
+def first_free_index(directory):
+    # Saved files are numbered contiguously, so the first gap is found by galloping
+    # and bisecting instead of listing the directory.
+    if not os.path.exists(saved_file_path(directory, 0)):
+        return 0
+    low, high = 0, 1
+    while os.path.exists(saved_file_path(directory, high)):
+        low, high = high, high * 2
+    while high - low > 1:
+        middle = (low + high) // 2
+        if os.path.exists(saved_file_path(directory, middle)):
+            low = middle
+        else:
+            high = middle
+    return high
+
+
+def reserve_filename(directory):
+    counter_path = os.path.join(directory, COUNTER_FILE)
+    try:
+        with open(counter_path) as f:
+            index = int(f.read())
+    except (OSError, ValueError):
+        index = first_free_index(directory)
+
+    # Exclusive creation makes the name ours even when several processes save at once.
+    while True:
+        filename = saved_file_path(directory, index)
+        try:
+            os.close(os.open(filename, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            index += 1
+
+    temp_path = f'{counter_path}.{os.getpid()}'
+    try:
+        with open(temp_path, 'w') as f:
+            f.write(str(index + 1))
+        os.replace(temp_path, counter_path)
+    except OSError:
+        pass
+    return filename
+
+
+def save_response_as_html(response, fsync=False, output_dir=OUTPUT_DIR):
+    os.makedirs(output_dir, exist_ok=True)
+
+    filename = reserve_filename(output_dir)
+    response.save(filename, fsync)
     print(f"Сохранено в файл: {filename}")
 
 
+def open_body(data, upload_file):
+    # Files are streamed from disk rather than read into memory.
+    return open(upload_file, 'rb') if upload_file else contextlib.nullcontext(data)
+
+
 def param_str_to_dict(raw: str) -> dict:
     if not raw.strip():
         return {}
@@ -1,2 +1,4 @@
 from .get import http_get
 from .post import http_post
+from .session import Session
+from .timeouts import Timeout
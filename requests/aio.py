@@ -0,0 +1,229 @@
+import asyncio
+import time
+
+from response import Response
+from exceptions import ConnectionError, RedirectError
+from .parser import ResponseParser
+from .pool import IDEMPOTENT_METHODS
+from .receive import DEFAULT_CHUNK_SIZE
+from .timeouts import as_deadline
+from .compression import ACCEPT_ENCODING, get_decoder, decode_body, compress_body
+from .upload import UploadBody
+from .session import (
+    REDIRECT_STATUSES,
+    UNIX_SCHEME,
+    parse_url,
+    join_url,
+    transport_key,
+    encode_body,
+    build_request,
+    remember_redirect,
+    default_redirect_cache
+)
+from . import dns, tls
+
+
+class AsyncConnection:
+    def __init__(self, reader, writer, key):
+        self.reader = reader
+        self.writer = writer
+        self.key = key
+        self.last_used = time.monotonic()
+        self.reused = False
+
+    def is_alive(self):
+        return not self.reader.at_eof() and not self.writer.is_closing()
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncConnectionPool:
+    # Same contract as ConnectionPool, for connections owned by one event loop.
+    def __init__(self, max_per_host=10, idle_timeout=30):
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self._idle = {}
+
+    async def acquire(self, host, port, connect, config=None):
+        key = (host, port, config)
+        now = time.monotonic()
+        idle = self._idle.get(key, [])
+        while idle:
+            conn = idle.pop()
+            if now - conn.last_used <= self.idle_timeout and conn.is_alive():
+                conn.reused = True
+                return conn
+            conn.close()
+        reader, writer = await connect()
+        return AsyncConnection(reader, writer, key)
+
+    def release(self, conn):
+        conn.last_used = time.monotonic()
+        idle = self._idle.setdefault(conn.key, [])
+        if len(idle) < self.max_per_host:
+            idle.append(conn)
+        else:
+            conn.close()
+
+    def discard(self, conn):
+        conn.close()
+
+    def idle_count(self, host, port, config=None):
+        return len(self._idle.get((host, port, config), []))
+
+    def clear(self):
+        idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn in connections:
+                conn.close()
+
+    async def exchange(self, host, port, connect, request, timeout=None, method='GET', config=None, body=None):
+        # Replays only what the blocking pool replays: idempotent requests whose
+        # reused connection failed on write or closed without a response byte.
+        retry = (body is None or body.replayable) and method.upper() in IDEMPOTENT_METHODS
+        deadline = as_deadline(timeout)
+        while True:
+            conn = await self.acquire(host, port, connect, config)
+            try:
+                try:
+                    conn.writer.write(request)
+                    await asyncio.wait_for(conn.writer.drain(), deadline.limit('write'))
+                    for frame in body.frames() if body is not None else ():
+                        conn.writer.write(frame)
+                        await asyncio.wait_for(conn.writer.drain(), deadline.limit('write'))
+                except asyncio.TimeoutError:
+                    raise deadline.error('write')
+                except OSError as e:
+                    if conn.reused and retry:
+                        self.discard(conn)
+                        continue
+                    raise ConnectionError(f"Connection error while sending the request: {e}")
+                try:
+                    result = await receive_response(conn.reader, method, deadline)
+                except asyncio.TimeoutError:
+                    raise deadline.error('read')
+                except OSError as e:
+                    raise ConnectionError(f"Connection error while reading the response: {e}")
+            except BaseException:
+                self.discard(conn)
+                raise
+            if result is None:
+                self.discard(conn)
+                if conn.reused and retry:
+                    continue
+                raise ConnectionError("Received an empty response from the server.")
+            parser, content = result
+            if parser.will_close:
+                self.discard(conn)
+            else:
+                self.release(conn)
+            return parser, content
+
+
+async def receive_response(reader, method='GET', timeout=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    deadline = as_deadline(timeout)
+    parser = ResponseParser(method)
+    body = []
+    while not parser.complete:
+        wanted = parser.wanted()
+        data = await asyncio.wait_for(reader.read(min(wanted or chunk_size, chunk_size)), deadline.limit('read'))
+        if not data:
+            if not parser.consumed:
+                return None
+            parser.feed_eof()
+            break
+        body.extend(data[a:b] for a, b in parser.feed(data))
+    return parser, b"".join(body)
+
+
+async def open_connection(host, port, timeout, verify=True, cafile=None, scheme='https'):
+    # asyncio connects and handshakes in one call, so both run under the connect limit.
+    deadline = as_deadline(timeout)
+    if scheme == UNIX_SCHEME:
+        connection = asyncio.open_unix_connection(host)
+    elif scheme == 'https':
+        connection = asyncio.open_connection(host, port, ssl=tls.get_context(verify, cafile), server_hostname=host,
+                                             happy_eyeballs_delay=dns.CONNECTION_ATTEMPT_DELAY, interleave=1)
+    else:
+        connection = asyncio.open_connection(host, port, happy_eyeballs_delay=dns.CONNECTION_ATTEMPT_DELAY,
+                                             interleave=1)
+    try:
+        return await asyncio.wait_for(connection, deadline.limit('connect'))
+    except asyncio.TimeoutError:
+        raise deadline.error('connect')
+    except OSError as e:
+        raise ConnectionError(f"Connection error: {e}")
+
+
+async def request(method, url, data=None, headers=None, cookies=None, timeout=1000, max_redirects=5, verify=True,
+                  cafile=None, pool=None, decode_content=True, compress=None):
+    pool = pool or get_default_pool()
+    method = method.upper()
+    deadline = as_deadline(timeout)
+    headers = dict(headers or {})
+    if decode_content and not any(key.lower() == 'accept-encoding' for key in headers):
+        headers['Accept-Encoding'] = ACCEPT_ENCODING
+    body = encode_body(method, data)
+    if compress and isinstance(body, UploadBody):
+        body.compress(compress)
+        headers['Content-Encoding'] = compress
+    elif compress and body:
+        body = compress_body(body, compress)
+        headers['Content-Encoding'] = compress
+    url = default_redirect_cache.resolve(url, max_redirects)
+    for _ in range(max_redirects + 1):
+        scheme, host, port, netloc, path = parse_url(url)
+        parser, content = await pool.exchange(
+            host, port,
+            lambda: open_connection(host, port, deadline, verify, cafile, scheme),
+            build_request(method, netloc, path, body, headers, cookies),
+            deadline, method, transport_key(scheme, verify, cafile), body if isinstance(body, UploadBody) else None
+        )
+        location = parser.header('Location')
+        if parser.status_code not in REDIRECT_STATUSES or not location:
+            decoder = get_decoder(parser.headers) if decode_content else None
+            if decoder is not None and content:
+                content = decode_body(content, decoder)
+            return Response(content, parser.status_code, parser.headers)
+        target = join_url(url, location)
+        if isinstance(body, UploadBody) and not body.replayable and parser.status_code != 303:
+            raise RedirectError(f"Cannot resend a streamed request body to {target}")
+        remember_redirect(default_redirect_cache, url, target, parser.status_code, parser)
+        if parser.status_code == 303 and method != 'HEAD':
+            method, body = 'GET', None
+            headers.pop('Content-Encoding', None)
+        url = target
+    raise RedirectError()
+
+
+_default_pools = {}
+
+
+def get_default_pool():
+    # Stream connections belong to the loop that opened them, so each loop gets its own pool.
+    loop = asyncio.get_running_loop()
+    pool = _default_pools.get(loop)
+    if pool is None:
+        for other in [other for other in _default_pools if other.is_closed()]:
+            del _default_pools[other]
+        pool = _default_pools[loop] = AsyncConnectionPool()
+    return pool
+
+
+async def http_get(url, headers=None, cookies=None, timeout=1000, max_redirects=5, verify=True, cafile=None):
+    return await request('GET', url, None, headers, cookies, timeout, max_redirects, verify, cafile)
+
+
+async def http_post(url, data=None, headers=None, cookies=None, timeout=1000, max_redirects=5, verify=True,
+                    cafile=None):
+    return await request('POST', url, data, headers, cookies, timeout, max_redirects, verify, cafile)
+
+
+async def http_put(url, data=None, headers=None, cookies=None, timeout=1000, max_redirects=5, verify=True,
+                   cafile=None):
+    return await request('PUT', url, data, headers, cookies, timeout, max_redirects, verify, cafile)
+
+
+async def http_delete(url, headers=None, cookies=None, timeout=1000, max_redirects=5, verify=True, cafile=None):
+    return await request('DELETE', url, None, headers, cookies, timeout, max_redirects, verify, cafile)
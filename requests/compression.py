@@ -0,0 +1,105 @@
+import zlib
+
+from exceptions import ResponseDecodeError, InvalidParamError
+
+ACCEPT_ENCODING = 'gzip, deflate'
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+SUPPORTED_ENCODINGS = ('gzip', 'x-gzip', 'deflate')
+UPLOAD_ENCODINGS = ('gzip', 'deflate')
+COMPRESS_CHUNK_SIZE = 1 << 20
+COMPRESS_LEVEL = 6
+
+
+class Decoder:
+    def __init__(self, encoding):
+        self.encoding = encoding
+        self._obj = self._new()
+        self._fed = False
+
+    def _new(self, wbits=None):
+        if wbits is None:
+            wbits = zlib.MAX_WBITS if self.encoding == 'deflate' else GZIP_WBITS
+        return zlib.decompressobj(wbits)
+
+    def decompress(self, data, max_length=0):
+        # Yields the decoded data in pieces of at most max_length bytes (0: unbounded),
+        # so a small compressed chunk never inflates into one huge buffer.
+        while data:
+            try:
+                output = self._obj.decompress(data, max_length)
+            except zlib.error as e:
+                if self.encoding != 'deflate' or self._fed:
+                    raise ResponseDecodeError(f"Failed to decode {self.encoding} body: {e}")
+                # Some servers send raw deflate without the zlib wrapper the spec asks for.
+                self._obj = self._new(-zlib.MAX_WBITS)
+                self._fed = True
+                continue
+            self._fed = True
+            data = self._obj.unconsumed_tail
+            if self._obj.eof and self._obj.unused_data and self.encoding != 'deflate':
+                # Concatenated gzip members decode as one body.
+                data = self._obj.unused_data
+                self._obj = self._new()
+            if output:
+                yield output
+
+    def flush(self):
+        return self._obj.flush()
+
+
+def get_decoder(headers):
+    encoding = ''
+    for key, value in headers.items():
+        if key.lower() == 'content-encoding':
+            encoding = value.strip().lower()
+    # Unknown or stacked codings are passed through untouched.
+    if encoding not in SUPPORTED_ENCODINGS:
+        return None
+    return Decoder(encoding)
+
+
+def decode_body(content, decoder):
+    return b"".join(decoder.decompress(content)) + decoder.flush()
+
+
+def compressor(encoding, level=COMPRESS_LEVEL):
+    if encoding not in UPLOAD_ENCODINGS:
+        raise InvalidParamError(f"Unsupported request body encoding: {encoding}")
+    return zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS if encoding == 'gzip' else zlib.MAX_WBITS)
+
+
+def compress_chunks(chunks, encoding, level=COMPRESS_LEVEL):
+    obj = compressor(encoding, level)
+    for chunk in chunks:
+        output = obj.compress(chunk)
+        if output:
+            yield output
+    yield obj.flush()
+
+
+def compress_body(body, encoding, level=COMPRESS_LEVEL):
+    # Fed to zlib in slices so the input is never copied as a whole.
+    view = memoryview(body)
+    slices = (view[start:start + COMPRESS_CHUNK_SIZE] for start in range(0, len(view), COMPRESS_CHUNK_SIZE))
+    return b"".join(compress_chunks(slices, encoding, level))
+
+
+class DecodedStream:
+    def __init__(self, raw, decoder):
+        self.raw = raw
+        self.decoder = decoder
+
+    @property
+    def parser(self):
+        return self.raw.parser
+
+    def iter_chunks(self, chunk_size=None):
+        chunk_size = chunk_size or self.raw.chunk_size
+        for chunk in self.raw.iter_chunks(chunk_size):
+            yield from self.decoder.decompress(chunk, chunk_size)
+        tail = self.decoder.flush()
+        if tail:
+            yield tail
+
+    def close(self):
+        self.raw.close()
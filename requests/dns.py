@@ -0,0 +1,162 @@
+import errno
+import os
+import selectors
+import socket
+import threading
+import time
+from collections import OrderedDict
+
+# getaddrinfo does not report record TTLs, so answers are kept for a fixed time.
+DEFAULT_TTL = 60
+NEGATIVE_TTL = 5
+MAX_ENTRIES = 1024
+CONNECTION_ATTEMPT_DELAY = 0.25
+IN_PROGRESS = (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN)
+
+
+class Resolver:
+    def __init__(self, ttl=DEFAULT_TTL, negative_ttl=NEGATIVE_TTL, max_entries=MAX_ENTRIES):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, host, port):
+        # Returns every address for host, rotated by one on each call so that
+        # consecutive connections are spread over all of them.
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                return self._rotate(entry)
+        try:
+            addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            self._store(key, [now + self.negative_ttl, e, 0])
+            raise
+        self._store(key, [now + self.ttl, addresses, 0])
+        return list(addresses)
+
+    def _store(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _rotate(entry):
+        addresses = entry[1]
+        if isinstance(addresses, socket.gaierror):
+            raise addresses
+        entry[2] = (entry[2] + 1) % len(addresses)
+        return addresses[entry[2]:] + addresses[:entry[2]]
+
+    def forget(self, host, port):
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def interleave(addresses):
+    # RFC 8305 ordering: alternate address families, IPv6 first when there is any.
+    families = sorted({address[0] for address in addresses}, key=lambda family: family != socket.AF_INET6)
+    groups = [[address for address in addresses if address[0] == family] for family in families]
+    ordered = []
+    for index in range(max((len(group) for group in groups), default=0)):
+        ordered.extend(group[index] for group in groups if index < len(group))
+    return ordered
+
+
+def create_connection(host, port, timeout=None, resolver=None, attempt_delay=CONNECTION_ATTEMPT_DELAY,
+                      timings=None):
+    resolver = resolver or default_resolver
+    started = time.perf_counter()
+    addresses = interleave(resolver.resolve(host, port))
+    if timings is not None:
+        timings.dns = time.perf_counter() - started
+        started = time.perf_counter()
+    try:
+        sock = race(addresses, timeout, attempt_delay, host)
+    except OSError:
+        # None of the cached addresses answered, so the next attempt asks DNS again.
+        resolver.forget(host, port)
+        raise
+    if timings is not None:
+        timings.connect = time.perf_counter() - started
+    return sock
+
+
+def race(addresses, timeout, attempt_delay, host):
+    # Happy Eyeballs: a new attempt starts every attempt_delay seconds (or as soon as
+    # one fails) while earlier ones are still pending, and the first to connect wins.
+    # timeout bounds the whole connect, not each attempt.
+    deadline = None if timeout is None else time.monotonic() + timeout
+    selector = selectors.DefaultSelector()
+    pending = []
+    error = None
+    next_attempt = 0
+    try:
+        while addresses or pending:
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                raise socket.timeout("timed out")
+            if addresses and (not pending or now >= next_attempt):
+                family, type, proto, _, address = addresses.pop(0)
+                try:
+                    # A family the kernel does not support fails here, before any connect.
+                    sock = socket.socket(family, type, proto)
+                except OSError as e:
+                    error = e
+                    continue
+                try:
+                    sock.setblocking(False)
+                    result = sock.connect_ex(address)
+                except OSError as e:
+                    sock.close()
+                    error = e
+                    continue
+                if result == 0:
+                    return _connected(sock, timeout)
+                if result not in IN_PROGRESS:
+                    sock.close()
+                    error = OSError(result, os.strerror(result))
+                    continue
+                selector.register(sock, selectors.EVENT_WRITE)
+                pending.append(sock)
+                next_attempt = now + attempt_delay
+                continue
+            waits = [next_attempt - now] if addresses else []
+            if deadline is not None:
+                waits.append(deadline - now)
+            for key, _ in selector.select(min(waits) if waits else None):
+                sock = key.fileobj
+                selector.unregister(sock)
+                pending.remove(sock)
+                result = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if result == 0:
+                    return _connected(sock, timeout)
+                sock.close()
+                error = OSError(result, os.strerror(result))
+                next_attempt = now
+    finally:
+        for sock in pending:
+            sock.close()
+        selector.close()
+    raise error or OSError(f"No addresses found for {host}")
+
+
+def _connected(sock, timeout):
+    # Heads and bodies go out in separate writes; Nagle would hold the body back.
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.settimeout(timeout)
+    return sock
+
+
+default_resolver = Resolver()
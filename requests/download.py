@@ -0,0 +1,306 @@
+import json
+import mmap
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from exceptions import ConnectionError, ResponseDecodeError, EntityChangedError
+from .session import Session
+
+DEFAULT_CONNECTIONS = 4
+# Files smaller than this many bytes per connection are not worth splitting further.
+MIN_PART_SIZE = 1024 * 1024
+# How often, in seconds, progress is written to the checkpoint while parts are downloading.
+CHECKPOINT_INTERVAL = 1.0
+CONTENT_RANGE = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)')
+
+
+def parse_content_range(value):
+    match = CONTENT_RANGE.fullmatch(value.strip())
+    if match is None:
+        raise ResponseDecodeError(f"Invalid Content-Range: {value}")
+    start, end, total = match.groups()
+    return int(start), int(end), None if total == '*' else int(total)
+
+
+def split_range(start, end, parts):
+    # [start, end) as at most `parts` contiguous (first, last) byte ranges, inclusive like Range.
+    size = end - start
+    parts = max(1, min(parts, size))
+    step, extra = divmod(size, parts)
+    ranges = []
+    for index in range(parts):
+        length = step + (1 if index < extra else 0)
+        ranges.append((start, start + length - 1))
+        start += length
+    return ranges
+
+
+class Checkpoint:
+    # What the next attempt needs to resume: the validator of the entity, its size and,
+    # for every part, [first, last, done]. last is None while a body of unknown size is
+    # still arriving. done only counts bytes already written, so the file is never behind it.
+    def __init__(self, path, url, validator='', total=None, parts=None):
+        self.path = path
+        self.url = url
+        self.validator = validator
+        self.total = total
+        self.parts = parts or []
+        self._lock = threading.Lock()
+        self._saved_at = time.monotonic()
+
+    @classmethod
+    def load(cls, path, url):
+        try:
+            with open(path, encoding='utf-8') as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(state, dict) or state.get('url') != url or not state.get('validator'):
+            return None
+        parts = state.get('parts')
+        if not isinstance(parts, list) or not all(isinstance(part, list) and len(part) == 3 for part in parts):
+            return None
+        return cls(path, url, state['validator'], state.get('total'), parts)
+
+    @property
+    def size(self):
+        if self.total is not None:
+            return self.total
+        return sum(done for _, _, done in self.parts)
+
+    def remaining(self):
+        return [
+            (index, first + done, last) for index, (first, last, done) in enumerate(self.parts)
+            if last is None or first + done <= last
+        ]
+
+    def advance(self, index, size):
+        with self._lock:
+            self.parts[index][2] += size
+            if time.monotonic() - self._saved_at < CHECKPOINT_INTERVAL:
+                return
+        self.save()
+
+    def save(self):
+        # Without a validator the next attempt could not tell whether the file changed.
+        if self.path is None or not self.validator:
+            return
+        with self._lock:
+            state = {'url': self.url, 'validator': self.validator, 'total': self.total,
+                     'parts': [list(part) for part in self.parts]}
+            self._saved_at = time.monotonic()
+        temp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(state, file)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            remove(temp_path)
+            raise
+
+    def remove(self):
+        remove(self.path)
+
+
+class FileWriter:
+    # Writes each part at its own offset, with pwrite or through a shared mapping of a
+    # file preallocated to the full size, so parts never wait on each other.
+    def __init__(self, file, size=None, use_mmap=False):
+        self.file = file
+        self.size = size
+        self.mapping = None
+        self._lock = threading.Lock()
+        if size is not None:
+            file.truncate(size)
+            # Without pwrite (Windows) the mapping is the only way to write at an offset from several threads.
+            use_mmap = use_mmap or not hasattr(os, 'pwrite')
+            self.mapping = mmap.mmap(file.fileno(), size) if use_mmap and size else None
+
+    def write(self, offset, data):
+        if self.mapping is not None:
+            self.mapping[offset:offset + len(data)] = data
+        elif hasattr(os, 'pwrite'):
+            view = memoryview(data)
+            while len(view):
+                written = os.pwrite(self.file.fileno(), view, offset)
+                view = view[written:]
+                offset += written
+        else:
+            # A body of unknown size has a single part, so the lock is never contended.
+            with self._lock:
+                self.file.seek(offset)
+                self.file.write(data)
+                self.file.flush()
+
+    def close(self):
+        if self.mapping is not None:
+            self.mapping.flush()
+            self.mapping.close()
+
+
+def fetch_part(session, url, index, start, last, writer, checkpoint, headers, timeout):
+    part_headers = {**headers, 'Range': f"bytes={start}-{'' if last is None else last}"}
+    if checkpoint.validator:
+        # If the file changed since the first response the server sends all of it instead.
+        part_headers['If-Range'] = checkpoint.validator
+    with session.get(url, headers=part_headers, stream=True, timeout=timeout, decode_content=False) as response:
+        if response.status_code == 200:
+            raise EntityChangedError(f"{url} changed while it was being downloaded")
+        if response.status_code != 206:
+            raise ConnectionError(f"Expected a partial response for bytes {start}-{last}, got {response.status_code}")
+        first, end, _ = parse_content_range(header(response, 'Content-Range'))
+        if first != start or (last is not None and end != last):
+            raise ResponseDecodeError(f"Requested bytes {start}-{last}, received {first}-{end}")
+        write_body(response, writer, start, end - start + 1, lambda size: checkpoint.advance(index, size))
+
+
+def write_body(response, writer, offset=0, length=None, progress=None):
+    written = 0
+    for chunk in response.iter_content():
+        if length is not None:
+            chunk = chunk[:length - written]
+        writer.write(offset + written, chunk)
+        written += len(chunk)
+        if progress is not None:
+            progress(len(chunk))
+        if written == length:
+            break
+    if length is not None and written < length:
+        raise ConnectionError(f"Connection closed after {written} of {length} bytes at offset {offset}")
+    return written
+
+
+def range_validator(response):
+    # If-Range only accepts a strong ETag; a weak one falls back to the date.
+    etag = header(response, 'ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return header(response, 'Last-Modified')
+
+
+def header(response, name, default=''):
+    name = name.lower()
+    for key, value in response.headers.items():
+        if key.lower() == name:
+            return value
+    return default
+
+
+def download(url, path, connections=DEFAULT_CONNECTIONS, headers=None, timeout=1000, session=None, use_mmap=False,
+             fsync=False, min_part_size=MIN_PART_SIZE, resume=True):
+    # With resume the body is kept in `path`.part next to a JSON checkpoint. An attempt
+    # that fails leaves both behind, and the next call for the same url asks only for the
+    # missing ranges, unless the server no longer reports the same ETag or Last-Modified.
+    # Bodies are never decoded, since ranges count bytes of the encoded entity.
+    session = session or Session()
+    headers = dict(headers or {})
+    part_path = f"{path}.part" if resume else f"{path}.{uuid.uuid4().hex}.part"
+    checkpoint = None
+    if resume and os.path.exists(part_path):
+        checkpoint = Checkpoint.load(f"{part_path}.json", url)
+    try:
+        if checkpoint is not None:
+            try:
+                with open(part_path, 'r+b') as file:
+                    fetch_remaining(session, url, file, checkpoint, connections, headers, timeout, use_mmap, fsync)
+            except EntityChangedError:
+                checkpoint = None
+        if checkpoint is None:
+            checkpoint = Checkpoint(f"{part_path}.json" if resume else None, url)
+            with open(part_path, 'w+b') as file:
+                start_download(session, url, file, checkpoint, headers, timeout, min_part_size, connections)
+                fetch_remaining(session, url, file, checkpoint, connections, headers, timeout, use_mmap, fsync)
+        os.replace(part_path, path)
+    except EntityChangedError:
+        # What was written belongs to another version of the file.
+        remove(part_path)
+        remove(f"{part_path}.json")
+        raise
+    except BaseException:
+        if resume and checkpoint is not None and checkpoint.validator:
+            checkpoint.save()
+        else:
+            remove(part_path)
+            remove(f"{part_path}.json")
+        raise
+    checkpoint.remove()
+    return checkpoint.size
+
+
+def start_download(session, url, file, checkpoint, headers, timeout, min_part_size, connections):
+    # The first request asks for the first part only. A 206 with the total size means
+    # the rest is split into ranges; any other answer is the whole body, written as it comes.
+    response = session.get(url, headers={**headers, 'Range': f"bytes=0-{min_part_size - 1}"}, stream=True,
+                           timeout=timeout, decode_content=False)
+    if response.status_code == 416:
+        # An empty file has no byte 0 to ask for.
+        response.close()
+        response = session.get(url, headers=headers, stream=True, timeout=timeout, decode_content=False)
+    with response:
+        checkpoint.validator = range_validator(response)
+        if response.status_code == 206:
+            start, end, total = parse_content_range(header(response, 'Content-Range'))
+            if start != 0 or total is None:
+                raise ResponseDecodeError(f"Unexpected Content-Range: {header(response, 'Content-Range')}")
+            checkpoint.total = total
+            checkpoint.parts = [[0, end, 0]]
+            if end + 1 < total:
+                ranges = split_range(end + 1, total, max(1, min(connections, (total - end - 1) // min_part_size)))
+                checkpoint.parts.extend([first, last, 0] for first, last in ranges)
+            length = end + 1
+        elif response.status_code >= 400:
+            raise ConnectionError(f"Download failed with status {response.status_code}")
+        else:
+            checkpoint.parts = [[0, None, 0]]
+            length = None
+        checkpoint.save()
+        writer = FileWriter(file, checkpoint.total)
+        try:
+            write_body(response, writer, 0, length, lambda size: checkpoint.advance(0, size))
+        finally:
+            writer.close()
+    if length is None:
+        # The whole body came with the first response.
+        checkpoint.parts[0][1] = checkpoint.parts[0][2] - 1
+
+
+def fetch_remaining(session, url, file, checkpoint, connections, headers, timeout, use_mmap=False, fsync=False):
+    writer = FileWriter(file, checkpoint.total, use_mmap)
+    try:
+        fetch_parts(session, url, writer, checkpoint, connections, headers, timeout)
+    finally:
+        writer.close()
+    if fsync:
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def fetch_parts(session, url, writer, checkpoint, connections, headers, timeout):
+    remaining = checkpoint.remaining()
+    if not remaining:
+        return
+    with ThreadPoolExecutor(min(connections, len(remaining))) as executor:
+        futures = [
+            executor.submit(fetch_part, session, url, index, start, last, writer, checkpoint, headers, timeout)
+            for index, start, last in remaining
+        ]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def remove(path):
+    if path is None:
+        return
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
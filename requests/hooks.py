@@ -0,0 +1,39 @@
+import threading
+
+from exceptions import InvalidParamError
+
+EVENTS = (
+    'request_start',
+    'connection_acquired',
+    'tls_done',
+    'headers_received',
+    'response_done',
+    'error',
+    'redirect',
+    'retry'
+)
+
+
+class Hooks:
+    # Handlers are called synchronously with the event's details as keyword
+    # arguments; an exception in a handler propagates to the request.
+    def __init__(self):
+        self._handlers = {event: () for event in EVENTS}
+        self._lock = threading.Lock()
+
+    def register(self, event, handler):
+        if event not in self._handlers:
+            raise InvalidParamError(f"Unknown event: {event}")
+        with self._lock:
+            self._handlers[event] = self._handlers[event] + (handler,)
+
+    def unregister(self, event, handler):
+        with self._lock:
+            self._handlers[event] = tuple(h for h in self._handlers.get(event, ()) if h is not handler)
+
+    def emit(self, event, **details):
+        for handler in self._handlers[event]:
+            handler(**details)
+
+
+default_hooks = Hooks()
@@ -0,0 +1,279 @@
+import socket
+import threading
+import time
+
+from exceptions import ConnectionError
+from .timeouts import as_deadline
+from . import tls
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.exceptions
+except ImportError:
+    h2 = None
+
+ALPN_PROTOCOLS = ('h2', 'http/1.1')
+READ_SIZE = 65536
+MAX_STREAM_ID = 2 ** 31 - 1
+# Headers that only mean something to an HTTP/1.1 connection and are forbidden in HTTP/2.
+CONNECTION_HEADERS = ('connection', 'keep-alive', 'proxy-connection', 'transfer-encoding', 'upgrade', 'host')
+
+
+def available():
+    return h2 is not None
+
+
+class Stream:
+    def __init__(self, timings=None):
+        self.timings = timings
+        self.status_code = None
+        self.headers = []
+        self.data = []
+        self.ended = False
+        self.error = None
+
+
+class HTTP2Connection:
+    # One TLS connection shared by every thread that uses it. Each request is a
+    # stream; whichever waiting thread finds nobody reading the socket becomes the
+    # reader and hands the frames it gets to their streams.
+    def __init__(self, sock, key=None):
+        self.sock = sock
+        self.key = key
+        self.conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=True, header_encoding=None))
+        self.streams = {}
+        self.used = False
+        self.closed = False
+        self.going_away = False
+        self._reading = False
+        self._cond = threading.Condition()
+        with self._cond:
+            self.conn.initiate_connection()
+            self._flush()
+
+    def is_usable(self):
+        with self._cond:
+            if self.closed or self.going_away:
+                return False
+            highest = self.conn.highest_outbound_stream_id
+            return highest is None or highest < MAX_STREAM_ID - 2
+
+    def request(self, method, authority, path, headers=None, body=None, timeout=None, timings=None):
+        deadline = as_deadline(timeout)
+        request_headers = [(':method', method), (':authority', authority), (':scheme', 'https'), (':path', path)]
+        request_headers.extend(
+            (key.lower(), str(value)) for key, value in (headers or {}).items()
+            if key.lower() not in CONNECTION_HEADERS
+        )
+        stream = Stream(timings)
+        write_started = time.perf_counter()
+
+        def open_stream():
+            stream_id = self.conn.get_next_available_stream_id()
+            self._call(self.conn.send_headers, stream_id, request_headers, end_stream=body is None)
+            self.streams[stream_id] = stream
+            return stream_id
+
+        # The check against the server's limit and the new stream must happen under one
+        # lock, or several threads could take the last free slot at once.
+        stream_id = self._wait(
+            lambda: self.conn.open_outbound_streams < self.conn.remote_settings.max_concurrent_streams,
+            deadline, open_stream
+        )
+        try:
+            if body is not None:
+                self._send_body(stream_id, stream, body, deadline)
+            if timings is not None:
+                timings.sent(write_started)
+            self._wait(lambda: stream.ended or stream.error is not None, deadline)
+        finally:
+            with self._cond:
+                self.streams.pop(stream_id, None)
+        if stream.error is not None:
+            raise stream.error
+        if timings is not None:
+            timings.finished(sum(len(chunk) for chunk in stream.data))
+        return stream.status_code, stream.headers, b"".join(stream.data)
+
+    def _send_body(self, stream_id, stream, chunks, deadline):
+        def send(view):
+            if stream.error is not None:
+                raise stream.error
+            size = min(self._window(stream_id), len(view))
+            self._call(self.conn.send_data, stream_id, view[:size].tobytes())
+            return size
+
+        for chunk in chunks:
+            view = memoryview(chunk).cast('B')
+            while len(view):
+                # The connection window is shared, so it is read and spent under the same lock.
+                size = self._wait(lambda: stream.error is not None or self._window(stream_id) > 0, deadline,
+                                  lambda: send(view))
+                view = view[size:]
+        with self._cond:
+            self._call(self.conn.end_stream, stream_id)
+
+    def _call(self, method, *args, **kwargs):
+        # Called with the lock held; the frames go out before it is released.
+        try:
+            method(*args, **kwargs)
+        except h2.exceptions.H2Error as e:
+            raise ConnectionError(f"HTTP/2 protocol error: {e}")
+        self._flush()
+
+    def _window(self, stream_id):
+        return min(self.conn.local_flow_control_window(stream_id), self.conn.max_outbound_frame_size)
+
+    def _wait(self, ready, deadline, then=None):
+        # Returns what `then` returns, called under the same lock that found `ready` true.
+        while True:
+            with self._cond:
+                if ready():
+                    return then() if then is not None else None
+                if self.closed:
+                    raise ConnectionError("The HTTP/2 connection was closed")
+                if self._reading:
+                    if not self._cond.wait(deadline.limit('read')):
+                        raise deadline.error('read')
+                    continue
+                self._reading = True
+            try:
+                self.sock.settimeout(deadline.limit('read'))
+                data = self.sock.recv(READ_SIZE)
+            except socket.timeout:
+                raise deadline.error('read')
+            except OSError as e:
+                self._fail(ConnectionError(f"Connection error while reading the response: {e}"))
+                raise ConnectionError(f"Connection error while reading the response: {e}")
+            finally:
+                with self._cond:
+                    self._reading = False
+                    self._cond.notify_all()
+            if not data:
+                self._fail(ConnectionError("Connection closed before the response was complete"))
+                continue
+            with self._cond:
+                try:
+                    events = self.conn.receive_data(data)
+                except h2.exceptions.ProtocolError as e:
+                    self._fail(ConnectionError(f"HTTP/2 protocol error: {e}"))
+                    continue
+                for event in events:
+                    self._handle(event)
+                self._flush()
+                self._cond.notify_all()
+
+    def _handle(self, event):
+        stream = self.streams.get(getattr(event, 'stream_id', None))
+        if isinstance(event, h2.events.ResponseReceived) and stream is not None:
+            if stream.timings is not None:
+                stream.timings.first_byte()
+            for name, value in event.headers:
+                if name == b':status':
+                    stream.status_code = int(value)
+                elif not name.startswith(b':'):
+                    stream.headers.append((name, value))
+        elif isinstance(event, h2.events.DataReceived):
+            self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+            if stream is not None:
+                stream.data.append(event.data)
+        elif isinstance(event, h2.events.StreamEnded) and stream is not None:
+            stream.ended = True
+        elif isinstance(event, h2.events.StreamReset) and stream is not None:
+            stream.error = ConnectionError(f"The server reset the HTTP/2 stream (error code {event.error_code})")
+        elif isinstance(event, h2.events.ConnectionTerminated):
+            # Streams above last_stream_id were never processed; the rest may still finish.
+            self.going_away = True
+            for stream_id, pending in self.streams.items():
+                if event.last_stream_id is None or stream_id > event.last_stream_id:
+                    pending.error = ConnectionError("The server closed the HTTP/2 connection")
+
+    def _fail(self, error):
+        with self._cond:
+            self.closed = True
+            for stream in self.streams.values():
+                if not stream.ended and stream.error is None:
+                    stream.error = error
+            self._cond.notify_all()
+
+    def _flush(self):
+        data = self.conn.data_to_send()
+        if data:
+            try:
+                self.sock.sendall(data)
+            except OSError as e:
+                self.closed = True
+                raise ConnectionError(f"Connection error while sending the request: {e}")
+
+    def close(self):
+        with self._cond:
+            if not self.closed:
+                self.closed = True
+                try:
+                    self.conn.close_connection()
+                    self.sock.sendall(self.conn.data_to_send())
+                except (OSError, h2.exceptions.ProtocolError):
+                    pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def http1_head(status_code, headers, length):
+    # The HTTP/1.1 head of a finished stream, so the rest of the client handles both alike.
+    lines = [b"HTTP/2 %d" % status_code]
+    lines.extend(name + b": " + value for name, value in headers if name.lower() != b'content-length')
+    lines.append(b"Content-Length: %d" % length)
+    return b"\r\n".join(lines) + b"\r\n\r\n"
+
+
+class HTTP2Pool:
+    # One multiplexed connection per (host, port, tls config). Origins that did not
+    # pick h2 during ALPN are remembered so that they skip straight to HTTP/1.1.
+    def __init__(self):
+        self._connections = {}
+        self._http1 = set()
+        self._lock = threading.Lock()
+
+    def acquire(self, host, port, connect, config=None):
+        # Returns (connection, None), or (None, socket) with an HTTP/1.1 socket, or (None, None).
+        key = (host, port, config)
+        with self._lock:
+            if key in self._http1:
+                return None, None
+            conn = self._connections.get(key)
+            if conn is not None and conn.is_usable():
+                return conn, None
+        sock = connect()
+        if getattr(sock, 'selected_alpn_protocol', lambda: None)() != 'h2':
+            with self._lock:
+                self._http1.add(key)
+            return None, sock
+        conn = HTTP2Connection(sock, key)
+        with self._lock:
+            existing = self._connections.get(key)
+            if existing is not None and existing.is_usable():
+                conn.close()
+                return existing, None
+            self._connections[key] = conn
+        tls.save_session(host, port, sock)
+        return conn, None
+
+    def discard(self, conn):
+        with self._lock:
+            if self._connections.get(conn.key) is conn:
+                del self._connections[conn.key]
+        conn.close()
+
+    def clear(self):
+        with self._lock:
+            connections, self._connections = self._connections, {}
+            self._http1.clear()
+        for conn in connections.values():
+            conn.close()
+
+
+default_http2_pool = HTTP2Pool()
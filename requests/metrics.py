@@ -0,0 +1,180 @@
+import bisect
+import os
+import threading
+import uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from .hooks import default_hooks
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+METRICS = {
+    'http_client_requests_total': ('counter', 'Requests started.'),
+    'http_client_responses_total': ('counter', 'Responses completed, per hop.'),
+    'http_client_errors_total': ('counter', 'Requests that raised.'),
+    'http_client_redirects_total': ('counter', 'Redirects followed.'),
+    'http_client_retries_total': ('counter', 'Requests replayed on a fresh connection.'),
+    'http_client_connections_total': ('counter', 'Connections handed out by the pool.'),
+    'http_client_sent_bytes_total': ('counter', 'Request bytes written.'),
+    'http_client_received_bytes_total': ('counter', 'Response bytes read.'),
+    'http_client_request_duration_seconds': ('histogram', 'Time from request start to the end of the body.'),
+    'http_client_ttfb_seconds': ('histogram', 'Time from request written to first response byte.'),
+    'http_client_tls_handshake_seconds': ('histogram', 'TLS handshake duration.'),
+}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsCollector:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._handlers = {
+            'request_start': self.on_request_start,
+            'connection_acquired': self.on_connection_acquired,
+            'tls_done': self.on_tls_done,
+            'response_done': self.on_response_done,
+            'error': self.on_error,
+            'redirect': self.on_redirect,
+            'retry': self.on_retry,
+        }
+
+    def attach(self, hooks=None):
+        hooks = hooks or default_hooks
+        for event, handler in self._handlers.items():
+            hooks.register(event, handler)
+        return self
+
+    def detach(self, hooks=None):
+        hooks = hooks or default_hooks
+        for event, handler in self._handlers.items():
+            hooks.unregister(event, handler)
+
+    def increment(self, name, labels=(), value=1):
+        key = (name, tuple(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=()):
+        key = (name, tuple(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def on_request_start(self, method, url):
+        self.increment('http_client_requests_total', [('method', method)])
+
+    def on_connection_acquired(self, host, port, reused):
+        self.increment('http_client_connections_total', [('reused', 'true' if reused else 'false')])
+
+    def on_tls_done(self, host, duration):
+        self.observe('http_client_tls_handshake_seconds', duration)
+
+    def on_response_done(self, timings):
+        method = [('method', timings.method or '')]
+        self.increment('http_client_responses_total', method + [('status', str(timings.status_code))])
+        self.increment('http_client_sent_bytes_total', method, timings.bytes_sent)
+        self.increment('http_client_received_bytes_total', method, timings.bytes_received)
+        self.observe('http_client_request_duration_seconds', timings.total, method)
+        if timings.ttfb is not None:
+            self.observe('http_client_ttfb_seconds', timings.ttfb, method)
+
+    def on_error(self, method, url, error):
+        self.increment('http_client_errors_total', [('method', method), ('type', type(error).__name__)])
+
+    def on_redirect(self, url, location, status_code):
+        self.increment('http_client_redirects_total', [('status', str(status_code))])
+
+    def on_retry(self, host, port, reason):
+        self.increment('http_client_retries_total', [('reason', reason)])
+
+    def render(self):
+        # Prometheus text exposition format.
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, (list(h.counts), h.sum, h.count)) for key, h in self._histograms.items()
+            )
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            if kind == 'counter':
+                samples = [(labels, value) for (metric, labels), value in counters if metric == name]
+            else:
+                samples = [(labels, value) for (metric, labels), value in histograms if metric == name]
+            if not samples:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                if kind == 'counter':
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', repr(float(bound))),))} {cumulative}")
+                lines.append(f"{name}_bucket{format_labels(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{format_labels(labels)} {total}")
+                lines.append(f"{name}_count{format_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def write(self, path):
+        # Written atomically so a textfile collector never reads a partial file.
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                file.write(self.render())
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def serve(self, host='127.0.0.1', port=9464):
+        collector = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = collector.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for key, value in labels
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
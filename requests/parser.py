@@ -0,0 +1,165 @@
+from exceptions import ConnectionError, ResponseDecodeError
+
+HEAD, BODY, CHUNK_SIZE, CHUNK_DATA, CHUNK_END, TRAILERS, DONE = range(7)
+NO_BODY_STATUSES = (204, 304)
+MAX_LINE_SIZE = 65536
+
+
+class ResponseParser:
+    def __init__(self, method='GET'):
+        self.method = method.upper()
+        self.consumed = 0
+        self._line = bytearray()
+        self._reset(0)
+
+    def _reset(self, head_start):
+        self.state = HEAD
+        self.version = None
+        self.status_code = None
+        self.reason = ''
+        self.headers = {}
+        self.remaining = None
+        self.will_close = False
+        self.head_start = head_start
+        self.head_end = None
+
+    @property
+    def complete(self):
+        return self.state == DONE
+
+    def header(self, name, default=''):
+        name = name.lower()
+        for key, value in self.headers.items():
+            if key.lower() == name:
+                return value
+        return default
+
+    @property
+    def chunked(self):
+        return 'chunked' in self.header('Transfer-Encoding').lower()
+
+    def wanted(self):
+        # Only a Content-Length body has a known size, so only those reads are bounded.
+        # A chunked body is read in whole chunk_size reads: its terminating chunk may
+        # share a read with bytes past the message, which only a pipelined connection
+        # has and which stay in its shared receive buffer.
+        if self.state == BODY:
+            return self.remaining
+        return None
+
+    def feed(self, data, start=0, end=None):
+        # Returns the (start, stop) spans of data[start:end] that belong to the body.
+        spans = []
+        pos = start
+        end = len(data) if end is None else end
+        while pos < end and self.state != DONE:
+            if self.state in (BODY, CHUNK_DATA):
+                size = end - pos if self.remaining is None else min(self.remaining, end - pos)
+                if spans and spans[-1][1] == pos:
+                    spans[-1] = (spans[-1][0], pos + size)
+                else:
+                    spans.append((pos, pos + size))
+                pos += size
+                if self.remaining is not None:
+                    self.remaining -= size
+                    if self.remaining == 0:
+                        self.state = DONE if self.state == BODY else CHUNK_END
+                continue
+
+            line_end = data.find(b"\n", pos, end)
+            if line_end == -1:
+                self._line += data[pos:end]
+                if len(self._line) > MAX_LINE_SIZE:
+                    raise ResponseDecodeError("Response line is too long")
+                pos = end
+                break
+            self._line += data[pos:line_end]
+            pos = line_end + 1
+            line = bytes(self._line).rstrip(b"\r")
+            self._line.clear()
+            self._handle_line(line, self.consumed + pos - start)
+        self.consumed += pos - start
+        return spans
+
+    def feed_eof(self):
+        if self.state == BODY and self.remaining is None:
+            self.state = DONE
+        elif self.state != DONE:
+            raise ConnectionError("Connection closed before the response was complete")
+
+    def _handle_line(self, line, offset):
+        if self.state == HEAD:
+            if self.status_code is None:
+                if not line:
+                    self.head_start = offset
+                    return
+                self._parse_status_line(line)
+            elif line:
+                self._parse_header_line(line)
+            else:
+                self.head_end = offset
+                self._start_body()
+        elif self.state == CHUNK_SIZE:
+            try:
+                size = int(line.split(b";", 1)[0].strip(), 16)
+            except ValueError:
+                raise ResponseDecodeError(f"Invalid chunk size: {line!r}")
+            if size == 0:
+                self.state = TRAILERS
+            else:
+                self.remaining = size
+                self.state = CHUNK_DATA
+        elif self.state == CHUNK_END:
+            if line:
+                raise ResponseDecodeError("Missing CRLF after chunk data")
+            self.state = CHUNK_SIZE
+        elif self.state == TRAILERS:
+            if not line:
+                self.state = DONE
+
+    def _parse_status_line(self, line):
+        parts = line.decode('iso-8859-1').split(None, 2)
+        try:
+            self.version = parts[0]
+            self.status_code = int(parts[1])
+        except (IndexError, ValueError):
+            raise ResponseDecodeError(f"Invalid status line: {line.decode('iso-8859-1')}")
+        if not self.version.startswith('HTTP/'):
+            raise ResponseDecodeError(f"Invalid status line: {line.decode('iso-8859-1')}")
+        self.reason = parts[2] if len(parts) > 2 else ''
+
+    def _parse_header_line(self, line):
+        text = line.decode('iso-8859-1')
+        if ':' not in text:
+            return
+        key, value = text.split(':', 1)
+        self.headers[key.strip()] = value.strip()
+
+    def _start_body(self):
+        status_code = self.status_code
+        if 100 <= status_code < 200 and status_code != 101:
+            # Interim responses (100 Continue, 103 Early Hints) precede the real one.
+            self._reset(self.head_end)
+            return
+        connection = self.header('Connection').lower()
+        if self.version == 'HTTP/1.0':
+            self.will_close = 'keep-alive' not in connection
+        else:
+            self.will_close = 'close' in connection
+
+        if self.method == 'HEAD' or status_code in NO_BODY_STATUSES or 100 <= status_code < 200:
+            self.state = DONE
+        elif self.chunked:
+            self.state = CHUNK_SIZE
+        elif self.header('Content-Length'):
+            try:
+                self.remaining = int(self.header('Content-Length'))
+            except ValueError:
+                raise ResponseDecodeError(f"Invalid Content-Length: {self.header('Content-Length')}")
+            if self.remaining < 0:
+                raise ResponseDecodeError(f"Invalid Content-Length: {self.header('Content-Length')}")
+            self.state = BODY if self.remaining else DONE
+        else:
+            self.remaining = None
+            self.will_close = True
+            self.state = BODY
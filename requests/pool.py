@@ -0,0 +1,229 @@
+import select
+import socket
+import threading
+import time
+
+from exceptions import ConnectionError, InvalidParamError
+from .receive import receive_message, receive_head, ResponseStream, ReceiveBuffer, DEFAULT_CHUNK_SIZE
+from .timeouts import as_deadline
+from . import tls
+
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS', 'TRACE')
+
+
+class PooledConnection:
+    def __init__(self, sock, key):
+        self.sock = sock
+        self.key = key
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.reused = False
+
+    def is_alive(self):
+        # select() cannot watch descriptors past FD_SETSIZE (1024), so poll is used where it exists.
+        try:
+            if hasattr(select, 'poll'):
+                poller = select.poll()
+                poller.register(self.sock, select.POLLIN)
+                readable = poller.poll(0)
+            else:
+                readable, _, _ = select.select([self.sock], [], [], 0)
+        except (OSError, ValueError, TypeError):
+            return False
+        # An idle keep-alive connection has nothing to read: readability means EOF or junk.
+        return not readable
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class ConnectionPool:
+    # max_per_host caps the idle connections kept per origin, not how many can be in
+    # use at once: acquire() always opens a new connection when none is idle.
+    def __init__(self, max_per_host=10, idle_timeout=30):
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host, port, connect, config=None):
+        # Connections made with different TLS settings must never be swapped.
+        key = (host, port, config)
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                conn = idle.pop()
+                if now - conn.last_used <= self.idle_timeout and conn.is_alive():
+                    conn.reused = True
+                    return conn
+                conn.close()
+        return PooledConnection(connect(), key)
+
+    def release(self, conn):
+        conn.last_used = time.monotonic()
+        with self._lock:
+            idle = self._idle.setdefault(conn.key, [])
+            if len(idle) < self.max_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def discard(self, conn):
+        conn.close()
+
+    def idle_count(self, host, port, config=None):
+        with self._lock:
+            return len(self._idle.get((host, port, config), []))
+
+    def clear(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn in connections:
+                conn.close()
+
+    def _send(self, host, port, connect, send, receive, deadline, method, config, timings=None, replayable=True):
+        # A pooled connection may have been closed by the server after the health
+        # check. The request is replayed on the next (eventually fresh) connection only
+        # if it is idempotent and the server cannot have answered it: the write failed
+        # or the connection closed without a single response byte.
+        retry = replayable and method.upper() in IDEMPOTENT_METHODS
+        while True:
+            conn = self.acquire(host, port, connect, config)
+            try:
+                if timings is not None:
+                    timings.acquired(host, port, conn.reused)
+                write_started = time.perf_counter()
+                try:
+                    conn.sock.settimeout(deadline.limit('write'))
+                    send(conn.sock)
+                except socket.timeout:
+                    raise deadline.error('write')
+                except OSError as e:
+                    if conn.reused and retry:
+                        self.discard(conn)
+                        if timings is not None:
+                            timings.retried(host, port, 'send_failed')
+                        continue
+                    raise ConnectionError(f"Connection error while sending the request: {e}")
+                if timings is not None:
+                    timings.sent(write_started)
+                try:
+                    conn.sock.settimeout(deadline.limit('read'))
+                    response = receive(conn.sock)
+                except socket.timeout:
+                    raise deadline.error('read')
+                except OSError as e:
+                    raise ConnectionError(f"Connection error while reading the response: {e}")
+            except Exception:
+                self.discard(conn)
+                raise
+            if response is None and conn.reused and retry:
+                self.discard(conn)
+                if timings is not None:
+                    timings.retried(host, port, 'empty_response')
+                continue
+            # TLS 1.3 delivers session tickets after the handshake, so the session
+            # is only worth storing once a response has been read.
+            tls.save_session(host, port, conn.sock)
+            return conn, response
+
+    def exchange(self, host, port, connect, send, receive=None, timeout=None, method='GET', config=None,
+                 timings=None, replayable=True):
+        # timeout is a number, a Timeout or a Deadline already running for this request.
+        deadline = as_deadline(timeout)
+        if receive is None:
+            receive = lambda sock: receive_message(sock, DEFAULT_CHUNK_SIZE, method, deadline, timings)
+        conn, response = self._send(host, port, connect, send, receive, deadline, method, config, timings,
+                                    replayable)
+        if response is not None and not response[0].will_close:
+            self.release(conn)
+        else:
+            self.discard(conn)
+        return response
+
+    def stream(self, host, port, connect, send, method='GET', timeout=None, chunk_size=DEFAULT_CHUNK_SIZE,
+               config=None, timings=None, replayable=True):
+        deadline = as_deadline(timeout)
+        conn, head = self._send(
+            host, port, connect, send, lambda sock: receive_head(sock, chunk_size, method, deadline, timings),
+            deadline, method, config, timings, replayable
+        )
+        if head is None:
+            self.discard(conn)
+            raise ConnectionError("Received an empty response from the server.")
+        parser, head_bytes, pending = head
+
+        def finish(reusable):
+            if reusable:
+                self.release(conn)
+            else:
+                self.discard(conn)
+
+        raw = ResponseStream(conn.sock, parser, pending, chunk_size, finish, deadline, timings)
+        if parser.complete:
+            raw.close()
+        return head_bytes, raw
+
+    def pipeline(self, host, port, connect, requests, timeout=None, config=None):
+        # requests are (method, request, timings) tuples, answered by what
+        # receive_message returns. All of them are written back-to-back on one
+        # connection and the responses read in order. Whatever is left unanswered
+        # when the server closes early is replayed one at a time.
+        if any(method.upper() not in IDEMPOTENT_METHODS for method, _, _ in requests):
+            raise InvalidParamError("Only idempotent requests can be pipelined")
+        if not requests:
+            return []
+        deadline = as_deadline(timeout)
+        responses = []
+        buffer = ReceiveBuffer()
+        conn = self.acquire(host, port, connect, config)
+        try:
+            for _, _, timings in requests:
+                if timings is not None:
+                    timings.acquired(host, port, conn.reused)
+            write_started = time.perf_counter()
+            try:
+                conn.sock.settimeout(deadline.limit('write'))
+                conn.sock.sendall(b"".join(request for _, request, _ in requests))
+            except socket.timeout:
+                raise deadline.error('write')
+            except OSError:
+                pass
+            else:
+                for _, _, timings in requests:
+                    if timings is not None:
+                        timings.sent(write_started)
+                for method, _, timings in requests:
+                    try:
+                        conn.sock.settimeout(deadline.limit('read'))
+                        response = receive_message(conn.sock, DEFAULT_CHUNK_SIZE, method, deadline, timings, buffer)
+                    except socket.timeout:
+                        raise deadline.error('read')
+                    except (OSError, ConnectionError):
+                        break
+                    if response is None:
+                        break
+                    responses.append(response)
+                    if response[0].will_close:
+                        break
+        except Exception:
+            self.discard(conn)
+            raise
+        if len(responses) == len(requests) and not responses[-1][0].will_close and not buffer.length:
+            tls.save_session(host, port, conn.sock)
+            self.release(conn)
+            return responses
+        self.discard(conn)
+        for method, request, timings in requests[len(responses):]:
+            responses.append(self.exchange(host, port, connect, lambda sock, request=request: sock.sendall(request),
+                                           timeout=deadline, method=method, config=config, timings=timings))
+        return responses
+
+
+default_pool = ConnectionPool()
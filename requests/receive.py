@@ -0,0 +1,167 @@
+import socket
+
+from exceptions import TimeoutError, ConnectionError
+from .parser import ResponseParser
+
+DEFAULT_CHUNK_SIZE = 65536
+# A Content-Length is only trusted this far up front; larger bodies grow the buffer as they arrive.
+MAX_PREALLOCATION = 16 * 1024 * 1024
+
+
+class ReceiveBuffer:
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.data = bytearray(chunk_size)
+        self.length = 0
+
+    def reserve(self, size):
+        if size > len(self.data):
+            self.data.extend(bytes(size - len(self.data)))
+
+    def fill(self, sock, want=None):
+        want = self.chunk_size if want is None else min(want, self.chunk_size)
+        if len(self.data) - self.length < want:
+            self.reserve(max(len(self.data) * 2, self.length + want))
+        with memoryview(self.data) as view, view[self.length:self.length + want] as free:
+            received = sock.recv_into(free)
+        self.length += received
+        return received
+
+    def find(self, sub, start=0):
+        return self.data.find(sub, start, self.length)
+
+    def getvalue(self, end=None):
+        end = self.length if end is None else min(end, self.length)
+        with memoryview(self.data) as view, view[:end] as part:
+            return bytes(part)
+
+    def discard(self, size):
+        # Keeps what follows the first size bytes, at the start of a fresh array.
+        with memoryview(self.data) as view, view[size:self.length] as rest:
+            data = bytearray(max(self.chunk_size, len(rest)))
+            data[:len(rest)] = rest
+        self.data = data
+        self.length -= size
+
+
+def receive_message(sock, chunk_size=DEFAULT_CHUNK_SIZE, method='GET', deadline=None, timings=None, buffer=None):
+    # Returns (parser, head, body), or None if the connection closed before any byte.
+    # A buffer shared between calls reads pipelined responses: bytes past the end of
+    # this message are left in it for the next call.
+    shared = buffer is not None
+    buffer = buffer if shared else ReceiveBuffer(chunk_size)
+    parser = ResponseParser(method)
+    spans = []
+    start = 0
+    while not parser.complete:
+        if start == buffer.length:
+            limit_read(sock, deadline)
+            if not buffer.fill(sock, parser.wanted()):
+                if not buffer.length:
+                    return None
+                parser.feed_eof()
+                break
+            if timings is not None:
+                timings.first_byte()
+        end = buffer.length
+        for span in parser.feed(buffer.data, start, end):
+            if spans and spans[-1][1] == span[0]:
+                spans[-1] = (spans[-1][0], span[1])
+            else:
+                spans.append(span)
+        start = end
+        if parser.wanted() is not None:
+            buffer.reserve(buffer.length + min(parser.wanted(), MAX_PREALLOCATION))
+    if timings is not None:
+        timings.finished(parser.consumed)
+    # The parser already knows where the head and the body spans are: the body is
+    # copied out of the buffer once, chunks joined in the same pass.
+    with memoryview(buffer.data) as view:
+        head = bytes(view[parser.head_start:parser.head_end])
+        body = b"".join([view[a:b] for a, b in spans])
+    if shared:
+        buffer.discard(parser.consumed)
+    return parser, head, body
+
+
+def limit_read(sock, deadline):
+    # The per-read limit is already on the socket; only a total deadline shrinks it between reads.
+    if deadline is not None and deadline.expires is not None:
+        sock.settimeout(deadline.limit('read'))
+
+
+def receive_head(sock, chunk_size=DEFAULT_CHUNK_SIZE, method='GET', deadline=None, timings=None):
+    buffer = ReceiveBuffer(chunk_size)
+    parser = ResponseParser(method)
+    spans = []
+    while parser.head_end is None:
+        start = buffer.length
+        limit_read(sock, deadline)
+        if not buffer.fill(sock, parser.wanted()):
+            if not buffer.length:
+                return None
+            parser.feed_eof()
+        elif timings is not None:
+            timings.first_byte()
+        spans.extend(parser.feed(buffer.data, start, buffer.length))
+    view = memoryview(buffer.data)
+    pending = b"".join([view[a:b] for a, b in spans])
+    return parser, bytes(view[parser.head_start:parser.head_end]), pending
+
+
+class ResponseStream:
+    # The connection is only handed back to its pool once the body has been read to
+    # the end; callers that stop early must close() the stream (Response supports
+    # `with`), otherwise the connection is dropped when the stream is collected.
+    def __init__(self, sock, parser, pending=b"", chunk_size=DEFAULT_CHUNK_SIZE, on_close=None, deadline=None,
+                 timings=None):
+        self.sock = sock
+        self.parser = parser
+        self.deadline = deadline
+        self.timings = timings
+        self.chunk_size = chunk_size
+        self.closed = False
+        self._pending = pending
+        self._on_close = on_close
+
+    def iter_chunks(self, chunk_size=None):
+        chunk_size = chunk_size or self.chunk_size
+        pending, self._pending = self._pending, b""
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        try:
+            for start in range(0, len(pending), chunk_size):
+                yield pending[start:start + chunk_size]
+            while not self.parser.complete and not self.closed:
+                wanted = self.parser.wanted()
+                try:
+                    limit_read(self.sock, self.deadline)
+                    received = self.sock.recv_into(buffer, min(chunk_size, wanted or chunk_size))
+                except socket.timeout:
+                    if self.deadline is not None:
+                        raise self.deadline.error('read')
+                    raise TimeoutError("Timed out while reading the response body")
+                except OSError as e:
+                    raise ConnectionError(f"Connection error while reading the response body: {e}")
+                if not received:
+                    self.parser.feed_eof()
+                    break
+                for a, b in self.parser.feed(buffer, 0, received):
+                    yield bytes(view[a:b])
+        finally:
+            view.release()
+            # Reusable only if the body was read to its end; otherwise this discards it.
+            self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.timings is not None:
+            self.timings.finished(self.parser.consumed)
+        if self._on_close is not None:
+            self._on_close(self.parser.complete and not self.parser.will_close)
+
+    def __del__(self):
+        self.close()
+
@@ -0,0 +1,473 @@
+import socket
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from urllib.parse import urlparse, urlencode, urljoin, unquote
+
+from response import Response
+from exceptions import TimeoutError, ConnectionError, RedirectError, ResponseDecodeError, InvalidParamError
+from .parser import ResponseParser
+from .pool import default_pool, PooledConnection, IDEMPOTENT_METHODS
+from .timeouts import as_deadline
+from .timings import Timings
+from .hooks import default_hooks
+from .compression import ACCEPT_ENCODING, get_decoder, decode_body, compress_body, DecodedStream
+from .upload import UploadBody, MAX_INLINE_BODY
+from .http2 import ALPN_PROTOCOLS, default_http2_pool, http1_head, available as http2_available
+from . import dns, tls
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+# http+unix://<percent-encoded socket path>/path, as in requests-unixsocket.
+UNIX_SCHEME = 'http+unix'
+UNIX_HOST = 'localhost'
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+PERMANENT_REDIRECT_STATUSES = (301, 308)
+MAX_CACHED_REDIRECTS = 1024
+# Redirect bodies up to this size are read so their connection can serve the next hop.
+MAX_REDIRECT_DRAIN = 65536
+
+
+def parse_url(url):
+    parsed_url = urlparse(url)
+    scheme = parsed_url.scheme.lower()
+    if scheme != UNIX_SCHEME and scheme not in DEFAULT_PORTS:
+        raise InvalidParamError(f"Unsupported URL scheme: {url}")
+    path = parsed_url.path if parsed_url.path else '/'
+    if parsed_url.query:
+        path += '?' + parsed_url.query
+    if scheme == UNIX_SCHEME:
+        # The socket path is case-sensitive, so it is taken from netloc rather than hostname.
+        if not parsed_url.netloc:
+            raise ConnectionError(f"Invalid URL: {url}")
+        return scheme, unquote(parsed_url.netloc), None, UNIX_HOST, path
+    if not parsed_url.hostname:
+        raise ConnectionError(f"Invalid URL: {url}")
+    return scheme, parsed_url.hostname, parsed_url.port or DEFAULT_PORTS[scheme], parsed_url.netloc, path
+
+
+def join_url(url, location):
+    # urljoin only resolves relative references for schemes it knows, which http+unix is not.
+    parsed = urlparse(url)
+    if parsed.scheme.lower() != UNIX_SCHEME or urlparse(location).scheme:
+        return urljoin(url, location)
+    target = urlparse(urljoin(parsed._replace(scheme='http').geturl(), location))
+    return target._replace(scheme=parsed.scheme).geturl()
+
+
+def encode_body(method, data):
+    # Mappings are form fields for POST and PUT; iterating one would send its keys.
+    if isinstance(data, Mapping):
+        if method not in ('POST', 'PUT'):
+            raise InvalidParamError(f"{method} requests cannot send form data")
+        data = urlencode(data)
+    elif method == 'POST' and data and isinstance(data, (list, tuple)):
+        data = urlencode(data)
+    if data is None or data == '':
+        return b'' if method in ('POST', 'PUT') else None
+    if isinstance(data, str):
+        data = data.encode()
+    if isinstance(data, bytes) and len(data) <= MAX_INLINE_BODY:
+        return data
+    # Large buffers, files and iterators are sent after the head, never copied into it.
+    return UploadBody(data)
+
+
+def build_request(method, netloc, path, body=None, headers=None, cookies=None):
+    request = [
+        f"{method} {path} HTTP/1.1\r\n",
+        f"Host: {netloc}\r\n",
+        "Connection: keep-alive\r\n"
+    ]
+    if isinstance(body, UploadBody) and body.chunked:
+        request.append("Transfer-Encoding: chunked\r\n")
+    elif isinstance(body, UploadBody):
+        request.append(f"Content-Length: {body.length}\r\n")
+    elif body is not None:
+        request.append(f"Content-Length: {len(body)}\r\n")
+    if headers:
+        request.extend(f"{key}: {value}\r\n" for key, value in headers.items())
+    if cookies:
+        cookie_header = '; '.join(f"{key}={value}" for key, value in cookies.items())
+        request.append(f"Cookie: {cookie_header}\r\n")
+    request.append("\r\n")
+    head = ''.join(request).encode()
+    return head + body if isinstance(body, bytes) and body else head
+
+
+def connect(host, port, timeout, verify=True, cafile=None, timings=None, scheme='https', alpn_protocols=None,
+            resolver=None):
+    deadline = as_deadline(timeout)
+    try:
+        if scheme == UNIX_SCHEME:
+            sock = unix_connection(host, deadline.limit('connect'), timings)
+        else:
+            sock = dns.create_connection(host, port, deadline.limit('connect'), resolver, timings=timings)
+    except socket.timeout:
+        raise deadline.error('connect')
+    except OSError as e:
+        raise ConnectionError(f"Connection error: {e}")
+    if scheme != 'https':
+        return sock
+    try:
+        sock.settimeout(deadline.limit('tls'))
+        started = time.perf_counter()
+        wrapped = tls.wrap_socket(sock, host, port, tls.get_context(verify, cafile, alpn_protocols))
+        if timings is not None:
+            timings.handshake_done(host, time.perf_counter() - started)
+        return wrapped
+    except socket.timeout:
+        sock.close()
+        raise deadline.error('tls')
+    except TimeoutError:
+        sock.close()
+        raise
+    except OSError as e:
+        sock.close()
+        raise ConnectionError(f"Connection error: {e}")
+
+
+def unix_connection(path, timeout, timings=None):
+    started = time.perf_counter()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(timeout)
+        sock.connect(path)
+    except BaseException:
+        sock.close()
+        raise
+    if timings is not None:
+        timings.connect = time.perf_counter() - started
+    return sock
+
+
+def transport_key(scheme, verify, cafile):
+    # Pool key part that keeps plain, unix and differently configured TLS connections apart.
+    if scheme != 'https':
+        return scheme
+    return tls.config_key(verify, cafile)
+
+
+def parse_head(head, method='GET'):
+    parser = ResponseParser(method)
+    parser.feed(head)
+    if parser.head_end is None:
+        raise ResponseDecodeError("Incomplete response head")
+    return parser
+
+
+def response_cookies(head):
+    # Headers are collapsed into a dict, so repeated Set-Cookie lines are read from the head itself.
+    cookies = {}
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.decode('iso-8859-1').partition(':')
+        if name.strip().lower() == 'set-cookie':
+            key, _, cookie_value = value.split(';', 1)[0].strip().partition('=')
+            if key:
+                cookies[key] = cookie_value
+    return cookies
+
+
+class RedirectCache:
+    def __init__(self, max_entries=MAX_CACHED_REDIRECTS):
+        self.max_entries = max_entries
+        self._targets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, url, target):
+        with self._lock:
+            self._targets[url] = target
+            self._targets.move_to_end(url)
+            while len(self._targets) > self.max_entries:
+                self._targets.popitem(last=False)
+
+    def resolve(self, url, max_hops):
+        # Follows cached hops only; a cycle stops after max_hops like a live redirect loop would.
+        with self._lock:
+            for _ in range(max_hops):
+                target = self._targets.get(url)
+                if target is None:
+                    return url
+                self._targets.move_to_end(url)
+                url = target
+            return url
+
+    def clear(self):
+        with self._lock:
+            self._targets.clear()
+
+
+def remember_redirect(cache, url, target, status_code, parser):
+    if status_code in PERMANENT_REDIRECT_STATUSES and 'no-store' not in parser.header('Cache-Control').lower():
+        cache.add(url, target)
+
+
+def drain(raw):
+    chunks = raw.iter_chunks()
+    try:
+        read = 0
+        for chunk in chunks:
+            read += len(chunk)
+            if read > MAX_REDIRECT_DRAIN:
+                break
+    finally:
+        chunks.close()
+        raw.close()
+
+
+default_redirect_cache = RedirectCache()
+
+
+class Session:
+    def __init__(self, pool=None, headers=None, cookies=None, timeout=1000, max_redirects=5, verify=True,
+                 cafile=None, redirect_cache=None, hooks=None, decode_content=True, http2=False, http2_pool=None,
+                 resolver=None):
+        if http2 and not http2_available():
+            raise InvalidParamError("HTTP/2 needs the optional 'h2' package: pip install h2")
+        self.pool = pool or default_pool
+        self.http2 = http2
+        self.http2_pool = http2_pool or default_http2_pool
+        self.hooks = hooks or default_hooks
+        # Resolver(ttl=..., negative_ttl=...) to cache DNS answers differently from the default.
+        self.resolver = resolver or dns.default_resolver
+        self.redirect_cache = redirect_cache or default_redirect_cache
+        self.headers = dict(headers or {})
+        self.cookies = dict(cookies or {})
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.verify = verify
+        self.cafile = cafile
+        self.decode_content = decode_content
+        # Cookies set by servers, kept per host so a redirect never carries them elsewhere.
+        self.jar = {}
+
+    def request(self, method, url, data=None, headers=None, cookies=None, timeout=None, max_redirects=None,
+                stream=False, verify=None, cafile=None, decode_content=None, compress=None):
+        method = method.upper()
+        self.hooks.emit('request_start', method=method, url=url)
+        try:
+            return self._request(method, url, data, headers, cookies, timeout, max_redirects, stream, verify, cafile,
+                                 decode_content, compress)
+        except Exception as e:
+            self.hooks.emit('error', method=method, url=url, error=e)
+            raise
+
+    def _request(self, method, url, data, headers, cookies, timeout, max_redirects, stream, verify, cafile,
+                 decode_content, compress):
+        # One deadline covers every hop and retry of this request.
+        deadline = as_deadline(self.timeout if timeout is None else timeout)
+        max_redirects = self.max_redirects if max_redirects is None else max_redirects
+        verify = self.verify if verify is None else verify
+        cafile = self.cafile if cafile is None else cafile
+        decode_content = self.decode_content if decode_content is None else decode_content
+        headers = self._headers(headers, decode_content)
+        body = encode_body(method, data)
+        if compress and isinstance(body, UploadBody):
+            body.compress(compress)
+            headers['Content-Encoding'] = compress
+        elif compress and body:
+            body = compress_body(body, compress)
+            headers['Content-Encoding'] = compress
+        url = self.redirect_cache.resolve(url, max_redirects)
+        started = time.perf_counter()
+
+        for redirects in range(max_redirects + 1):
+            scheme, host, port, netloc, path = parse_url(url)
+            timings = Timings(started, self.hooks, method, url)
+            timings.redirects = redirects
+            response = None
+            if self.http2 and scheme == 'https':
+                response = self.send_http2(host, port, netloc, path, method, body, headers,
+                                           self._cookies(host, cookies), deadline, verify, cafile, timings)
+            if response is None:
+                request = build_request(method, netloc, path, body, headers, self._cookies(host, cookies))
+                timings.bytes_sent = len(request)
+                response = self.send(host, port, request, method, deadline, stream, verify, cafile, timings,
+                                     body if isinstance(body, UploadBody) else None, scheme)
+            head, parser, content, raw = response
+            self.jar.setdefault(host, {}).update(response_cookies(head))
+            timings.headers_received(parser.status_code, parser.headers)
+            location = parser.header('Location')
+            if parser.status_code not in REDIRECT_STATUSES or not location:
+                return self._response(parser, content, raw, timings, decode_content)
+            if raw is not None:
+                drain(raw)
+            target = join_url(url, location)
+            if isinstance(body, UploadBody) and not body.replayable and parser.status_code != 303:
+                raise RedirectError(f"Cannot resend a streamed request body to {target}")
+            remember_redirect(self.redirect_cache, url, target, parser.status_code, parser)
+            self.hooks.emit('redirect', url=url, location=target, status_code=parser.status_code)
+            if parser.status_code == 303 and method != 'HEAD':
+                method, body = 'GET', None
+                headers.pop('Content-Encoding', None)
+            url = target
+        raise RedirectError()
+
+    def pipeline(self, urls, headers=None, cookies=None, timeout=None, verify=None, cafile=None,
+                 decode_content=None, method='GET'):
+        # Requests to the same origin are written back-to-back on one connection and
+        # answered in order; responses come back in the order of urls. Redirects are
+        # then followed one request at a time.
+        method = method.upper()
+        if method not in IDEMPOTENT_METHODS:
+            raise InvalidParamError(f"{method} requests cannot be pipelined")
+        deadline = as_deadline(self.timeout if timeout is None else timeout)
+        verify = self.verify if verify is None else verify
+        cafile = self.cafile if cafile is None else cafile
+        decode_content = self.decode_content if decode_content is None else decode_content
+        request_headers = self._headers(headers, decode_content)
+        started = time.perf_counter()
+        origins = {}
+        for index, url in enumerate(urls):
+            self.hooks.emit('request_start', method=method, url=url)
+            url = self.redirect_cache.resolve(url, self.max_redirects)
+            scheme, host, port, netloc, path = parse_url(url)
+            request = build_request(method, netloc, path, None, request_headers, self._cookies(host, cookies))
+            timings = Timings(started, self.hooks, method, url)
+            timings.bytes_sent = len(request)
+            origins.setdefault((scheme, host, port), []).append((index, url, request, timings))
+
+        responses = [None] * len(urls)
+        for (scheme, host, port), entries in origins.items():
+            try:
+                messages = self.pool.pipeline(
+                    host, port, lambda: connect(host, port, deadline, verify, cafile, entries[0][3], scheme,
+                                                resolver=self.resolver),
+                    [(method, request, timings) for _, _, request, timings in entries], deadline,
+                    transport_key(scheme, verify, cafile)
+                )
+            except Exception as e:
+                for _, url, _, _ in entries:
+                    self.hooks.emit('error', method=method, url=url, error=e)
+                raise
+            for (index, url, _, timings), message in zip(entries, messages):
+                if message is None:
+                    raise ConnectionError("Received an empty response from the server.")
+                parser, head, content = message
+                self.jar.setdefault(host, {}).update(response_cookies(head))
+                timings.headers_received(parser.status_code, parser.headers)
+                location = parser.header('Location')
+                if parser.status_code in REDIRECT_STATUSES and location:
+                    target = join_url(url, location)
+                    remember_redirect(self.redirect_cache, url, target, parser.status_code, parser)
+                    self.hooks.emit('redirect', url=url, location=target, status_code=parser.status_code)
+                    try:
+                        responses[index] = self._request(method, target, None, headers, cookies, deadline,
+                                                         self.max_redirects - 1, False, verify, cafile,
+                                                         decode_content, None)
+                    except Exception as e:
+                        self.hooks.emit('error', method=method, url=url, error=e)
+                        raise
+                else:
+                    responses[index] = self._response(parser, content, None, timings, decode_content)
+        return responses
+
+    def _headers(self, headers, decode_content):
+        headers = {**self.headers, **(headers or {})}
+        if decode_content and not any(key.lower() == 'accept-encoding' for key in headers):
+            headers['Accept-Encoding'] = ACCEPT_ENCODING
+        return headers
+
+    def _cookies(self, host, cookies):
+        return {**self.cookies, **self.jar.get(host, {}), **(cookies or {})}
+
+    def _response(self, parser, content, raw, timings, decode_content):
+        decoder = get_decoder(parser.headers) if decode_content else None
+        if decoder is not None and raw is not None:
+            raw = DecodedStream(raw, decoder)
+        elif decoder is not None and content:
+            content = decode_body(content, decoder)
+        response = Response(content, parser.status_code, parser.headers, raw=raw)
+        response.timings = timings
+        return response
+
+    def send(self, host, port, request, method, timeout, stream, verify, cafile, timings=None, body=None,
+             scheme='https'):
+        connect_socket = lambda: connect(host, port, timeout, verify, cafile, timings, scheme, resolver=self.resolver)
+        config = transport_key(scheme, verify, cafile)
+        # A body that cannot be rewound must not be replayed on a fresh connection.
+        replayable = body is None or body.replayable
+
+        def send(sock):
+            sock.sendall(request)
+            if body is not None:
+                sent = body.send(sock)
+                if timings is not None:
+                    timings.bytes_sent = len(request) + sent
+
+        if stream:
+            head, raw = self.pool.stream(host, port, connect_socket, send, method, timeout, config=config,
+                                         timings=timings, replayable=replayable)
+            return head, raw.parser, None, raw
+        response = self.pool.exchange(host, port, connect_socket, send, timeout=timeout, method=method,
+                                      config=config, timings=timings, replayable=replayable)
+        if response is None:
+            raise ConnectionError("Received an empty response from the server.")
+        parser, head, content = response
+        return head, parser, content, None
+
+    def send_http2(self, host, port, netloc, path, method, body, headers, cookies, timeout, verify, cafile,
+                   timings=None):
+        # Returns None when the origin did not negotiate h2, for the caller to send over HTTP/1.1.
+        config = tls.config_key(verify, cafile)
+        conn, sock = self.http2_pool.acquire(
+            host, port,
+            lambda: connect(host, port, timeout, verify, cafile, timings, 'https', ALPN_PROTOCOLS,
+                            resolver=self.resolver),
+            config
+        )
+        if conn is None:
+            if sock is not None:
+                # The connection was made for h2 but speaks HTTP/1.1: let the next exchange use it.
+                self.pool.release(PooledConnection(sock, (host, port, config)))
+            return None
+        if timings is not None:
+            timings.acquired(host, port, conn.used)
+        conn.used = True
+        headers = dict(headers)
+        if cookies:
+            headers['Cookie'] = '; '.join(f"{key}={value}" for key, value in cookies.items())
+        chunks = None
+        if isinstance(body, UploadBody):
+            chunks = body.payload()
+            if not body.chunked:
+                headers['Content-Length'] = body.length
+        elif body is not None:
+            chunks = [body]
+            headers['Content-Length'] = len(body)
+        try:
+            status_code, response_headers, content = conn.request(method, netloc, path, headers, chunks, timeout,
+                                                                  timings)
+        except ConnectionError:
+            # A reset stream leaves the connection to the others; a dead one is dropped.
+            if conn.closed:
+                self.http2_pool.discard(conn)
+            raise
+        if timings is not None and body is not None:
+            timings.bytes_sent = len(body) if isinstance(body, bytes) else body.length or 0
+        head = http1_head(status_code, response_headers, len(content))
+        return head, parse_head(head, method), content, None
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, data=None, **kwargs):
+        return self.request('POST', url, data, **kwargs)
+
+    def put(self, url, data=None, **kwargs):
+        return self.request('PUT', url, data, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def close(self):
+        if self.pool is not default_pool:
+            self.pool.clear()
+        if self.http2_pool is not default_http2_pool:
+            self.http2_pool.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,51 @@
+import time
+
+from exceptions import TimeoutError
+
+PHASES = ('connect', 'tls', 'write', 'read')
+
+
+class Timeout:
+    # connect, tls, write and read bound each socket operation of that phase; total
+    # bounds the whole request, redirects and retries included. None means no limit.
+    def __init__(self, connect=None, read=None, write=None, tls=None, total=None):
+        self.connect = connect
+        self.read = read
+        self.write = write
+        self.tls = connect if tls is None else tls
+        self.total = total
+
+    def start(self):
+        return Deadline(self)
+
+
+class Deadline:
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.expires = None if timeout.total is None else time.monotonic() + timeout.total
+
+    def limit(self, phase):
+        value = getattr(self.timeout, phase)
+        if self.expires is None:
+            return value
+        remaining = self.expires - time.monotonic()
+        if remaining <= 0:
+            raise self.error(phase)
+        return remaining if value is None else min(value, remaining)
+
+    def expired(self):
+        return self.expires is not None and time.monotonic() >= self.expires
+
+    def error(self, phase):
+        if self.expired():
+            return TimeoutError(f"Total timeout of {self.timeout.total}s expired during {phase}", 'total')
+        return TimeoutError(f"Timed out during {phase} after {getattr(self.timeout, phase)}s", phase)
+
+
+def as_deadline(timeout):
+    # A bare number keeps the old meaning: the same limit for every socket operation.
+    if isinstance(timeout, Deadline):
+        return timeout
+    if not isinstance(timeout, Timeout):
+        timeout = Timeout(timeout, timeout, timeout)
+    return timeout.start()
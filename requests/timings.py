@@ -0,0 +1,91 @@
+import time
+
+FIELDS = ('dns', 'connect', 'tls', 'write', 'ttfb', 'transfer', 'total', 'bytes_sent', 'bytes_received', 'reused',
+          'redirects')
+
+
+class Timings:
+    # Durations are in seconds and stay None for phases that did not happen, e.g.
+    # dns, connect and tls on a reused connection. total runs from the start of the
+    # request, redirects included, to the end of the body. Lifecycle events of the
+    # hop are reported to hooks as they are recorded.
+    def __init__(self, started=None, hooks=None, method=None, url=None):
+        self.started = time.perf_counter() if started is None else started
+        self.hooks = hooks
+        self.method = method
+        self.url = url
+        self.status_code = None
+        self.dns = None
+        self.connect = None
+        self.tls = None
+        self.write = None
+        self.ttfb = None
+        self.transfer = None
+        self.total = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.reused = False
+        self.redirects = 0
+        self._sent_at = None
+        self._first_byte_at = None
+        self._reported = False
+
+    def acquired(self, host, port, reused):
+        self.reused = reused
+        if self.hooks is not None:
+            self.hooks.emit('connection_acquired', host=host, port=port, reused=reused)
+
+    def handshake_done(self, host, duration):
+        self.tls = duration
+        if self.hooks is not None:
+            self.hooks.emit('tls_done', host=host, duration=duration)
+
+    def retried(self, host, port, reason):
+        if self.hooks is not None:
+            self.hooks.emit('retry', host=host, port=port, reason=reason)
+
+    def sent(self, write_started):
+        self._sent_at = time.perf_counter()
+        self.write = self._sent_at - write_started
+
+    def first_byte(self):
+        if self._first_byte_at is None:
+            self._first_byte_at = time.perf_counter()
+            if self._sent_at is not None:
+                self.ttfb = self._first_byte_at - self._sent_at
+
+    def finished(self, bytes_received):
+        now = time.perf_counter()
+        self.transfer = now - (self._first_byte_at or now)
+        self.total = now - self.started
+        self.bytes_received = bytes_received
+        self._report_done()
+
+    def headers_received(self, status_code, headers):
+        self.status_code = status_code
+        if self.hooks is not None:
+            self.hooks.emit('headers_received', method=self.method, url=self.url, status_code=status_code,
+                            headers=headers)
+        self._report_done()
+
+    def _report_done(self):
+        # A buffered body is complete before its headers are handed over, a streamed
+        # one after: response_done waits for both.
+        if self.hooks is None or self._reported or self.status_code is None or self.total is None:
+            return
+        self._reported = True
+        self.hooks.emit('response_done', timings=self)
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in FIELDS}
+
+    def format(self, template):
+        # curl -w style: %{name} is replaced by a field, durations in seconds.
+        output = template.replace('\\n', '\n').replace('\\t', '\t')
+        for field, value in self.as_dict().items():
+            if isinstance(value, bool):
+                value = int(value)
+            elif isinstance(value, float) or (value is None and field not in ('bytes_sent', 'bytes_received')):
+                value = f"{value or 0:.6f}"
+            output = output.replace(f"%{{{field}}}", str(value))
+        return output
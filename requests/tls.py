@@ -0,0 +1,71 @@
+import ssl
+import threading
+import time
+from collections import OrderedDict
+
+MAX_SESSIONS = 256
+
+_contexts = {}
+_sessions = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_context(verify=True, cafile=None, alpn_protocols=None):
+    key = (verify, cafile, tuple(alpn_protocols or ()))
+    with _lock:
+        context = _contexts.get(key)
+        if context is None:
+            context = ssl.create_default_context(cafile=cafile)
+            if not verify:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            if alpn_protocols:
+                context.set_alpn_protocols(list(alpn_protocols))
+            _contexts[key] = context
+    return context
+
+
+def config_key(verify=True, cafile=None):
+    # Pool key for connections made with these settings; None for the defaults.
+    if verify and cafile is None:
+        return None
+    return verify, cafile
+
+
+def save_session(host, port, sock):
+    session = getattr(sock, 'session', None)
+    if isinstance(session, ssl.SSLSession):
+        with _lock:
+            _sessions[(host, port, id(sock.context))] = (sock.context, session)
+            _sessions.move_to_end((host, port, id(sock.context)))
+            while len(_sessions) > MAX_SESSIONS:
+                _sessions.popitem(last=False)
+
+
+def get_session(host, port, context):
+    # A session can only be resumed by the context that negotiated it.
+    key = (host, port, id(context))
+    with _lock:
+        stored = _sessions.get(key)
+        if stored is None or stored[0] is not context:
+            return None
+        session = stored[1]
+        if session.time + session.timeout < time.time():
+            del _sessions[key]
+            return None
+        _sessions.move_to_end(key)
+    return session
+
+
+def wrap_socket(sock, host, port=443, context=None):
+    if context is None:
+        context = get_context()
+    wrapped = context.wrap_socket(sock, server_hostname=host, session=get_session(host, port, context))
+    save_session(host, port, wrapped)
+    return wrapped
+
+
+def clear():
+    with _lock:
+        _contexts.clear()
+        _sessions.clear()
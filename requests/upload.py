@@ -0,0 +1,146 @@
+import io
+import mmap
+import os
+import stat
+
+from exceptions import ConnectionError, InvalidParamError
+from .compression import UPLOAD_ENCODINGS, compress_chunks
+
+UPLOAD_CHUNK_SIZE = 65536
+# Bodies up to this size are written in the same call as the head.
+MAX_INLINE_BODY = 65536
+BUFFER_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+
+
+class UploadBody:
+    # A body written after the head instead of being joined to it. Buffers are sent
+    # in place, files and iterators one chunk at a time; without a known length the
+    # body goes out with chunked transfer-encoding.
+    def __init__(self, data, chunk_size=UPLOAD_CHUNK_SIZE):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.encoding = None
+        self.buffer = isinstance(data, BUFFER_TYPES)
+        self.file = not self.buffer and hasattr(data, 'read')
+        self.start = position(data) if self.file else None
+        self.length = None
+        self.sent = False
+        if self.buffer:
+            with memoryview(data) as view:
+                self.length = view.nbytes
+        elif self.file:
+            self.length = file_length(data, self.start)
+        else:
+            self.data = iter(data)
+
+    @property
+    def chunked(self):
+        return self.length is None
+
+    @property
+    def replayable(self):
+        return self.buffer or self.start is not None
+
+    def compress(self, encoding):
+        if encoding not in UPLOAD_ENCODINGS:
+            raise InvalidParamError(f"Unsupported request body encoding: {encoding}")
+        self.encoding = encoding
+        self.length = None
+
+    def chunks(self):
+        if self.buffer:
+            with memoryview(self.data) as view, view.cast('B') as flat:
+                for start in range(0, len(flat), self.chunk_size):
+                    yield flat[start:start + self.chunk_size]
+            return
+        source = read_chunks(self.data, self.chunk_size) if self.file else self.data
+        for chunk in source:
+            yield chunk.encode() if isinstance(chunk, str) else chunk
+
+    def payload(self):
+        # The body as sent, compressed if asked, without any transfer framing.
+        self.rewind()
+        chunks = self.chunks()
+        if self.encoding is not None:
+            chunks = compress_chunks(chunks, self.encoding)
+        return chunks
+
+    def frames(self):
+        # The bytes that follow the head on the wire.
+        chunks = self.payload()
+        if self.chunked:
+            for chunk in chunks:
+                if len(chunk):
+                    yield b"%x\r\n" % len(chunk) + chunk + b"\r\n"
+            yield b"0\r\n\r\n"
+            return
+        written = 0
+        for chunk in chunks:
+            chunk = chunk[:self.length - written]
+            written += len(chunk)
+            yield chunk
+            if written == self.length:
+                return
+        if written < self.length:
+            raise ConnectionError(f"Request body ended after {written} of {self.length} bytes")
+
+    def send(self, sock):
+        if not self.chunked and self.encoding is None and self.buffer:
+            self.rewind()
+            with memoryview(self.data) as view, view.cast('B') as flat:
+                sock.sendall(flat)
+            return self.length
+        if not self.chunked and self.file and regular_file(self.data):
+            self.rewind()
+            sent = sock.sendfile(self.data, count=self.length)
+            if sent < self.length:
+                raise ConnectionError(f"Request body ended after {sent} of {self.length} bytes")
+            return sent
+        sent = 0
+        for frame in self.frames():
+            sock.sendall(frame)
+            sent += len(frame)
+        return sent
+
+    def rewind(self):
+        if self.sent and not self.replayable:
+            raise ConnectionError("A streamed request body cannot be sent twice")
+        self.sent = True
+        if self.start is not None:
+            self.data.seek(self.start)
+
+
+def position(file):
+    try:
+        return file.tell()
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def file_length(file, start):
+    # A text file's length in bytes is only known once it is encoded, so it goes chunked.
+    if start is None or isinstance(file, io.TextIOBase):
+        return None
+    try:
+        end = file.seek(0, io.SEEK_END)
+        file.seek(start)
+    except (OSError, ValueError, AttributeError):
+        return None
+    return end - start
+
+
+def regular_file(file):
+    if not isinstance(file, (io.BufferedIOBase, io.RawIOBase)):
+        return False
+    try:
+        return stat.S_ISREG(os.fstat(file.fileno()).st_mode)
+    except (OSError, ValueError):
+        return False
+
+
+def read_chunks(file, chunk_size):
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
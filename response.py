@@ -1,8 +1,118 @@
+import codecs
+import os
+import uuid
+
+from exceptions import HttpClientError
+
+DEFAULT_ENCODING = 'utf-8'
+DEFAULT_CHUNK_SIZE = 65536
+
+
 class Response:
-    def __init__(self, contents, status_code, headers):
-        self.contents = contents
+    def __init__(self, contents, status_code, headers, raw=None):
         self.status_code = status_code
         self.headers = headers
+        self.raw = raw
+        self.timings = None
+        self._text = None
+        self._consumed = False
+        if raw is not None:
+            contents = None
+        elif isinstance(contents, str):
+            self._text = contents
+            contents = contents.encode(self.encoding, errors='replace')
+        self._content = contents
+
+    @property
+    def content(self):
+        if self._content is None:
+            if self._consumed:
+                raise HttpClientError("The response body has already been consumed")
+            self._consumed = True
+            self._content = b"".join(self.raw.iter_chunks())
+        return self._content
+
+    def iter_content(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        if self._content is not None:
+            for start in range(0, len(self._content), chunk_size):
+                yield self._content[start:start + chunk_size]
+            return
+        if self._consumed:
+            raise HttpClientError("The response body has already been consumed")
+        self._consumed = True
+        yield from self.raw.iter_chunks(chunk_size)
+
+    def iter_lines(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        pending = b""
+        for chunk in self.iter_content(chunk_size):
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                yield line[:-1] if line.endswith(b"\r") else line
+        if pending:
+            yield pending
+
+    def save(self, filename, fsync=False):
+        # The body goes to a sibling temporary file that only replaces `filename`
+        # once it is complete, so readers never see a partial download.
+        temp_name = f"{filename}.{uuid.uuid4().hex}.part"
+        try:
+            with open(temp_name, 'xb') as file:
+                for chunk in self.iter_content():
+                    file.write(chunk)
+                if fsync:
+                    file.flush()
+                    os.fsync(file.fileno())
+            os.replace(temp_name, filename)
+        except BaseException:
+            self.close()
+            try:
+                os.unlink(temp_name)
+            except OSError:
+                pass
+            raise
+        if fsync and hasattr(os, 'O_DIRECTORY'):
+            directory = os.open(os.path.dirname(os.path.abspath(filename)), os.O_DIRECTORY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+
+    def close(self):
+        if self.raw is not None:
+            self.raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def encoding(self):
+        content_type = ''
+        for key, value in self.headers.items():
+            if key.lower() == 'content-type':
+                content_type = value
+        for param in content_type.split(';')[1:]:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'charset':
+                charset = value.strip().strip('"\'')
+                try:
+                    return codecs.lookup(charset).name
+                except LookupError:
+                    break
+        return DEFAULT_ENCODING
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = str(self.content, self.encoding, errors='replace')
+        return self._text
+
+    @property
+    def contents(self):
+        return self.text
 
     def get_status_code(self):
         return self.status_code
@@ -11,4 +121,4 @@ class Response:
         return self.headers
 
     def get_content(self):
-        return self.contents
\ No newline at end of file
+        return self.text
@@ -0,0 +1,52 @@
+import socket
+import threading
+import unittest
+from unittest.mock import patch
+from requests.pool import default_pool
+from requests.session import default_redirect_cache
+
+
+def socket_pair(test, timeout=1):
+    # The client end goes to the code under test; the server end is closed with the test.
+    client, server = socket.socketpair()
+    client.settimeout(timeout)
+    test.addCleanup(server.close)
+    return client, server
+
+
+def serve_in_thread(test, *responses):
+    # Each response is written once its request has arrived, as a real server would.
+    client, server = socket_pair(test)
+
+    def answer():
+        for response in responses:
+            server.recv(4096)
+            server.sendall(response)
+
+    thread = threading.Thread(target=answer)
+    thread.start()
+    test.addCleanup(thread.join)
+    return client
+
+
+class DefaultSessionTestCase(unittest.TestCase):
+    # The module-level http_* functions share the default pool and redirect cache;
+    # connect() hands out the client end of self.server's socketpair instead.
+    def setUp(self):
+        self.client, self.server = socket_pair(self)
+        self.addCleanup(default_pool.clear)
+        self.addCleanup(default_redirect_cache.clear)
+        patcher = patch('requests.session.connect', return_value=self.client)
+        self.connect = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def serve(self, *responses):
+        # One connection per response: a response must close its connection to move on to the next one.
+        clients, servers = [], []
+        for response in responses:
+            client, server = socket_pair(self)
+            server.sendall(response)
+            clients.append(client)
+            servers.append(server)
+        self.connect.side_effect = clients
+        return servers
@@ -0,0 +1,134 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+from exceptions import ConnectionError, TimeoutError, RedirectError
+from requests import aio
+from requests.session import default_redirect_cache
+
+
+class TestAsyncClient(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.requests = []
+        self.connections = 0
+        self.responses = []
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.pool = aio.AsyncConnectionPool()
+        self.addCleanup(default_redirect_cache.clear)
+
+        async def connect(host, port, timeout, verify=True, cafile=None, scheme=None):
+            return await asyncio.open_connection('127.0.0.1', self.port)
+
+        patcher = patch('requests.aio.open_connection', connect)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch('requests.aio.get_default_pool', lambda: self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        self.pool.clear()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                body = await reader.readexactly(length)
+                self.requests.append(head + body)
+                response = self.responses.pop(0)
+                if response is None:
+                    return
+                writer.write(response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    async def test_get_reuses_connection(self):
+        self.responses = [
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: 5\r\n\r\nHello",
+            b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n3\r\nabc\r\n0\r\n\r\n",
+        ]
+        first = await aio.http_get('https://example.com/a?x=1')
+        second = await aio.http_get('https://example.com/b')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.text, 'Hello')
+        self.assertEqual(first.headers['Content-Type'], 'text/plain')
+        self.assertEqual(second.content, b'abc')
+        self.assertEqual(self.connections, 1)
+        self.assertTrue(self.requests[0].startswith(b"GET /a?x=1 HTTP/1.1\r\nHost: example.com\r\n"))
+
+    async def test_concurrent_requests(self):
+        self.responses = [b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok"] * 20
+        responses = await asyncio.gather(*[aio.http_get('https://example.com/') for _ in range(20)])
+        self.assertEqual([r.content for r in responses], [b'ok'] * 20)
+
+    async def test_post_put_delete(self):
+        self.responses = [
+            b"HTTP/1.1 201 Created\r\nContent-Length: 0\r\n\r\n",
+            b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n",
+            b"HTTP/1.1 204 No Content\r\n\r\n",
+        ]
+        post = await aio.http_post('https://example.com/p', {'k': 'v'})
+        put = await aio.http_put('https://example.com/p', 'payload')
+        delete = await aio.http_delete('https://example.com/p')
+
+        self.assertEqual((post.status_code, put.status_code, delete.status_code), (201, 200, 204))
+        self.assertTrue(self.requests[0].startswith(b"POST /p HTTP/1.1"))
+        self.assertTrue(self.requests[0].endswith(b"\r\n\r\nk=v"))
+        self.assertTrue(self.requests[1].endswith(b"\r\n\r\npayload"))
+        self.assertTrue(self.requests[2].startswith(b"DELETE /p HTTP/1.1"))
+
+    async def test_follows_redirects(self):
+        self.responses = [
+            b"HTTP/1.1 301 Moved\r\nLocation: /new\r\nContent-Length: 0\r\n\r\n",
+            b"HTTP/1.1 200 OK\r\nContent-Length: 4\r\n\r\ndone",
+        ]
+        response = await aio.http_get('https://example.com/old')
+        self.assertEqual(response.content, b'done')
+        self.assertTrue(self.requests[1].startswith(b"GET /new HTTP/1.1"))
+
+    async def test_too_many_redirects(self):
+        self.responses = [b"HTTP/1.1 302 Found\r\nLocation: /loop\r\nContent-Length: 0\r\n\r\n"] * 2
+        with self.assertRaises(RedirectError):
+            await aio.http_get('https://example.com/loop', max_redirects=1)
+
+    async def test_retries_idempotent_request_on_stale_connection(self):
+        self.responses = [b"HTTP/1.1 200 OK\r\nContent-Length: 1\r\n\r\na", None,
+                          b"HTTP/1.1 200 OK\r\nContent-Length: 1\r\n\r\nb"]
+        await aio.http_get('https://example.com/')
+        response = await aio.http_get('https://example.com/')
+        self.assertEqual(response.content, b'b')
+        self.assertEqual(self.connections, 2)
+
+    async def test_post_is_not_replayed(self):
+        self.responses = [b"HTTP/1.1 200 OK\r\nContent-Length: 1\r\n\r\na", None]
+        await aio.http_get('https://example.com/')
+        with self.assertRaises(ConnectionError):
+            await aio.http_post('https://example.com/', {'k': 'v'})
+        self.assertEqual(len(self.requests), 2)
+
+    async def test_timeout(self):
+        async def stall(reader, writer):
+            await asyncio.sleep(1)
+            writer.close()
+
+        self.server.close()
+        self.server = await asyncio.start_server(stall, '127.0.0.1', 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        with self.assertRaises(TimeoutError):
+            await aio.http_get('https://example.com/', timeout=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
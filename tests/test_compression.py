@@ -0,0 +1,90 @@
+import gzip
+import socket
+import unittest
+import zlib
+from unittest.mock import patch
+from exceptions import ResponseDecodeError, InvalidParamError
+from requests.compression import Decoder, get_decoder, decode_body, compress_body, compress_chunks
+from requests.pool import ConnectionPool
+from requests.session import Session, RedirectCache
+
+TEXT = b"<html>" + b"compressible " * 1000 + b"</html>"
+
+
+class TestDecoder(unittest.TestCase):
+
+    def test_gzip(self):
+        self.assertEqual(decode_body(gzip.compress(TEXT), Decoder('gzip')), TEXT)
+
+    def test_concatenated_gzip_members(self):
+        self.assertEqual(decode_body(gzip.compress(b"a" * 10) + gzip.compress(b"b" * 10), Decoder('gzip')),
+                         b"a" * 10 + b"b" * 10)
+
+    def test_deflate_with_and_without_zlib_wrapper(self):
+        self.assertEqual(decode_body(zlib.compress(TEXT), Decoder('deflate')), TEXT)
+        raw = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        self.assertEqual(decode_body(raw.compress(TEXT) + raw.flush(), Decoder('deflate')), TEXT)
+
+    def test_output_is_bounded(self):
+        pieces = list(Decoder('gzip').decompress(gzip.compress(TEXT), 1024))
+        self.assertTrue(all(len(piece) <= 1024 for piece in pieces))
+        self.assertEqual(b"".join(pieces), TEXT)
+
+    def test_corrupt_body(self):
+        with self.assertRaises(ResponseDecodeError):
+            decode_body(b"not gzip at all", Decoder('gzip'))
+
+    def test_get_decoder(self):
+        self.assertEqual(get_decoder({'content-encoding': 'GZIP'}).encoding, 'gzip')
+        self.assertIsNone(get_decoder({'Content-Encoding': 'br'}))
+        self.assertIsNone(get_decoder({'Content-Encoding': 'gzip, deflate'}))
+        self.assertIsNone(get_decoder({}))
+
+
+class TestCompress(unittest.TestCase):
+
+    def test_round_trip(self):
+        self.assertEqual(gzip.decompress(compress_body(TEXT, 'gzip')), TEXT)
+        self.assertEqual(zlib.decompress(compress_body(TEXT, 'deflate')), TEXT)
+
+    def test_chunks_compress_as_one_stream(self):
+        self.assertEqual(gzip.decompress(b"".join(compress_chunks([TEXT[:100], TEXT[100:]], 'gzip'))), TEXT)
+
+    def test_unsupported_encoding(self):
+        with self.assertRaises(InvalidParamError):
+            compress_body(TEXT, 'br')
+
+
+class TestSessionDecoding(unittest.TestCase):
+
+    def setUp(self):
+        self.client, self.server = socket.socketpair()
+        self.client.settimeout(1)
+        self.addCleanup(self.server.close)
+        self.session = Session(ConnectionPool(), timeout=1, redirect_cache=RedirectCache())
+        self.addCleanup(self.session.close)
+        patcher = patch('requests.session.connect', return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        body = gzip.compress(TEXT)
+        self.server.sendall(b"HTTP/1.1 200 OK\r\nContent-Encoding: gzip\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+
+    def test_buffered_body_is_decoded(self):
+        response = self.session.get('https://example.com/')
+        self.assertEqual(response.content, TEXT)
+        self.assertIn(b"Accept-Encoding: gzip, deflate\r\n", self.server.recv(4096))
+
+    def test_streamed_body_is_decoded(self):
+        response = self.session.get('https://example.com/', stream=True)
+        chunks = list(response.iter_content(4096))
+        self.assertEqual(b"".join(chunks), TEXT)
+        self.assertTrue(all(len(chunk) <= 4096 for chunk in chunks))
+
+    def test_opt_out_passes_raw_body(self):
+        response = self.session.get('https://example.com/', decode_content=False)
+        self.assertEqual(response.content, gzip.compress(TEXT))
+        self.assertNotIn(b"Accept-Encoding", self.server.recv(4096))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,114 +1,43 @@
 import unittest
-from unittest.mock import patch
-from exceptions import (
-    TimeoutError,
-    ConnectionError,
-    RedirectError,
-    ResponseDecodeError
-)
-from requests.delete import (
-    create_request,
-    parse_response,
-    handle_redirect,
-    http_delete
-)
-from response import Response
+from exceptions import TimeoutError, RedirectError
+from requests.delete import http_delete
+from tests.helpers import DefaultSessionTestCase
 
 
-class TestHTTPDeleteMethods(unittest.TestCase):
+class TestHttpDelete(DefaultSessionTestCase):
 
-    def test_create_request(self):
-        request = create_request('https://example.com/path?query=123', {'Header': 'Value'}, {'cookie': 'value'})
-        expected_request = b"DELETE /path?query=123 HTTP/1.1\r\nHost: example.com\r\nConnection: close\r\nHeader: Value\r\nCookie: cookie=value\r\n\r\n"
-        self.assertEqual(request, expected_request)
+    def test_http_delete_success(self):
+        self.server.sendall(b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: 13\r\n\r\nHello, World!")
 
-    def test_parse_response(self):
-        response = parse_response(b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\n\r\nHello, World!")
-        self.assertEqual(response.contents, "Hello, World!")
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.headers, {"Content-Type": "text/plain"})
-        with self.assertRaises(ResponseDecodeError):
-            parse_response(b"")
-        with self.assertRaises(ResponseDecodeError):
-            parse_response(b"")
-
-
-    def test_handle_redirect(self):
-        url, redirect_count = handle_redirect('https://example.com', {'Location': '/new-path'}, 5, 0)
-        self.assertEqual(url, 'https://example.com/new-path')
-        self.assertEqual(redirect_count, 1)
-
-        url, redirect_count = handle_redirect('https://example.com', {}, 5, 0)
-        self.assertEqual(url, 'https://example.com')
-        self.assertEqual(redirect_count, 0)
+        response = http_delete('https://example.com/path?query=123', {'Header': 'Value'}, {'cookie': 'value'})
 
-        with self.assertRaises(RedirectError):
-            handle_redirect('https://example.com', {'Location': '/new-path'}, 1, 1)
-
-    @patch('requests.delete.send_request')
-    @patch('requests.delete.parse_response')
-    @patch('requests.delete.handle_redirect')
-    def test_http_delete_success(self, mock_handle_redirect, mock_parse_response, mock_send_request):
-        mock_send_request.return_value = b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\n\r\nHello, World!"
-        mock_parse_response.return_value = Response("Hello, World!", 200, {"Content-Type": "text/plain"})
-        mock_handle_redirect.return_value = ('https://example.com', 1)
-
-        response = http_delete('https://example.com', headers={'Header': 'Value'}, cookies={'cookie': 'value'})
         self.assertEqual(response.contents, "Hello, World!")
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.headers, {"Content-Type": "text/plain"})
-
-    @patch('requests.delete.send_request')
-    @patch('requests.delete.parse_response')
-    @patch('requests.delete.handle_redirect')
-    def test_http_delete_redirect(self, mock_handle_redirect, mock_parse_response, mock_send_request):
-        mock_send_request.side_effect = [
-            b"HTTP/1.1 302 Found\r\nLocation: /new-path\r\n\r\n",
-            b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\n\r\nHello, World!"
-        ]
-        mock_parse_response.side_effect = [
-            Response("", 302, {"Location": "/new-path"}),
-            Response("Hello, World!", 200, {"Content-Type": "text/plain"})
-        ]
-        mock_handle_redirect.side_effect = [
-            ('https://example.com/new-path', 1),
-            ('https://example.com/new-path', 1)
-        ]
-
-        response = http_delete('https://example.com', headers={'Header': 'Value'}, cookies={'cookie': 'value'})
-        self.assertEqual(response.contents, "Hello, World!")
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.headers, {"Content-Type": "text/plain"})
-
-    @patch('requests.delete.send_request')
-    @patch('requests.delete.parse_response')
-    @patch('requests.delete.handle_redirect')
-    def test_http_delete_max_redirects(self, mock_handle_redirect, mock_parse_response, mock_send_request):
-        mock_send_request.return_value = b"HTTP/1.1 302 Found\r\nLocation: /new-path\r\n\r\n"
-        mock_parse_response.return_value = Response("", 302, {"Location": "/new-path"})
-        mock_handle_redirect.return_value = ('https://example.com/new-path', 1)
-
+        self.assertEqual(response.headers, {"Content-Type": "text/plain", "Content-Length": "13"})
+        self.assertEqual(self.server.recv(1024), (
+            b"DELETE /path?query=123 HTTP/1.1\r\nHost: example.com\r\nConnection: keep-alive\r\n"
+            b"Header: Value\r\nAccept-Encoding: gzip, deflate\r\nCookie: cookie=value\r\n\r\n"
+        ))
+
+    def test_http_delete_redirect(self):
+        servers = self.serve(
+            b"HTTP/1.1 307 Temporary Redirect\r\nLocation: https://example.com/new\r\nConnection: close\r\n"
+            b"Content-Length: 0\r\n\r\n",
+            b"HTTP/1.1 204 No Content\r\n\r\n"
+        )
+        response = http_delete('https://example.com/old')
+        self.assertEqual(response.status_code, 204)
+        self.assertTrue(servers[1].recv(1024).startswith(b"DELETE /new HTTP/1.1"))
+
+    def test_http_delete_max_redirects(self):
+        self.serve(*[b"HTTP/1.1 301 Moved\r\nLocation: /loop\r\nConnection: close\r\nContent-Length: 0\r\n\r\n"] * 3)
         with self.assertRaises(RedirectError):
-            http_delete('https://example.com', headers={'Header': 'Value'}, cookies={'cookie': 'value'}, max_redirects=0)
-
-    @patch('requests.delete.send_request')
-    @patch('requests.delete.parse_response')
-    @patch('requests.delete.handle_redirect')
-    def test_http_delete_timeout(self, mock_handle_redirect, mock_parse_response, mock_send_request):
-        mock_send_request.side_effect = TimeoutError()
-
-        with self.assertRaises(TimeoutError):
-            http_delete('https://example.com', headers={'Header': 'Value'}, cookies={'cookie': 'value'})
-
-    @patch('requests.delete.send_request')
-    @patch('requests.delete.parse_response')
-    @patch('requests.delete.handle_redirect')
-    def test_http_delete_connection_error(self, mock_handle_redirect, mock_parse_response, mock_send_request):
-        mock_send_request.side_effect = ConnectionError("An error occurred: Test exception")
+            http_delete('https://example.com/loop', max_redirects=2)
 
-        with self.assertRaises(ConnectionError):
-            http_delete('https://example.com', headers={'Header': 'Value'}, cookies={'cookie': 'value'})
+    def test_http_delete_timeout(self):
+        with self.assertRaises(TimeoutError) as context:
+            http_delete('https://example.com/path', timeout=0.05)
+        self.assertEqual(context.exception.phase, 'read')
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,145 @@
+import errno
+import socket
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from exceptions import TimeoutError
+from requests.dns import Resolver, create_connection, interleave
+from requests.pool import ConnectionPool
+from requests.session import Session, RedirectCache
+
+
+def address_info(*hosts):
+    return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (host, 443)) for host in hosts]
+
+
+class TestResolver(unittest.TestCase):
+
+    @patch('socket.getaddrinfo')
+    def test_resolve_caches_and_rotates(self, mock_getaddrinfo):
+        mock_getaddrinfo.return_value = address_info('10.0.0.1', '10.0.0.2')
+        resolver = Resolver()
+
+        first = resolver.resolve('example.com', 443)
+        second = resolver.resolve('example.com', 443)
+        third = resolver.resolve('example.com', 443)
+
+        self.assertEqual([a[4][0] for a in first], ['10.0.0.1', '10.0.0.2'])
+        self.assertEqual([a[4][0] for a in second], ['10.0.0.2', '10.0.0.1'])
+        self.assertEqual([a[4][0] for a in third], ['10.0.0.1', '10.0.0.2'])
+        mock_getaddrinfo.assert_called_once()
+
+    @patch('socket.getaddrinfo')
+    def test_resolve_expires_entries(self, mock_getaddrinfo):
+        mock_getaddrinfo.return_value = address_info('10.0.0.1')
+        resolver = Resolver(ttl=0)
+        resolver.resolve('example.com', 443)
+        resolver.resolve('example.com', 443)
+        self.assertEqual(mock_getaddrinfo.call_count, 2)
+
+    @patch('socket.getaddrinfo')
+    def test_resolve_caches_failures(self, mock_getaddrinfo):
+        mock_getaddrinfo.side_effect = socket.gaierror("not found")
+        resolver = Resolver()
+        for _ in range(2):
+            with self.assertRaises(socket.gaierror):
+                resolver.resolve('missing.example', 443)
+        mock_getaddrinfo.assert_called_once()
+
+    @patch('socket.getaddrinfo')
+    def test_resolve_evicts_oldest_entry(self, mock_getaddrinfo):
+        mock_getaddrinfo.return_value = address_info('10.0.0.1')
+        resolver = Resolver(max_entries=1)
+        resolver.resolve('a.example', 443)
+        resolver.resolve('b.example', 443)
+        resolver.resolve('a.example', 443)
+        self.assertEqual(mock_getaddrinfo.call_count, 3)
+
+
+class TestCreateConnection(unittest.TestCase):
+
+    def listen(self, backlog=8):
+        server = socket.socket()
+        server.bind(('127.0.0.1', 0))
+        server.listen(backlog)
+        self.addCleanup(server.close)
+        return server.getsockname()
+
+    def resolver_for(self, *addresses):
+        resolver = MagicMock()
+        resolver.resolve.return_value = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', address) for address in addresses]
+        return resolver
+
+    def closed_port(self):
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        address = sock.getsockname()
+        sock.close()
+        return address
+
+    def test_interleave_alternates_families(self):
+        v4 = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (f'10.0.0.{i}', 443)) for i in range(3)]
+        v6 = [(socket.AF_INET6, socket.SOCK_STREAM, 6, '', (f'::{i}', 443, 0, 0)) for i in range(1)]
+        self.assertEqual(interleave(v4 + v6), [v6[0], v4[0], v4[1], v4[2]])
+
+    def test_fails_over_to_next_address(self):
+        address = self.listen()
+        sock = create_connection('example.com', 443, 5, self.resolver_for(self.closed_port(), address))
+        self.addCleanup(sock.close)
+        self.assertEqual(sock.getpeername(), address)
+        self.assertEqual(sock.gettimeout(), 5)
+
+    def test_races_a_stalled_address(self):
+        # A full accept queue makes further connects hang, like a blackholed address.
+        stalled = self.listen(backlog=0)
+        fillers = []
+        for _ in range(3):
+            filler = socket.socket()
+            filler.setblocking(False)
+            filler.connect_ex(stalled)
+            fillers.append(filler)
+            self.addCleanup(filler.close)
+        address = self.listen()
+
+        started = time.monotonic()
+        sock = create_connection('example.com', 443, 5, self.resolver_for(stalled, address), attempt_delay=0.05)
+        self.addCleanup(sock.close)
+        self.assertEqual(sock.getpeername(), address)
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_skips_unsupported_address_family(self):
+        address = self.listen()
+        resolver = self.resolver_for(address)
+        resolver.resolve.return_value.insert(0, (socket.AF_INET6, socket.SOCK_STREAM, 6, '', ('::1', 443, 0, 0)))
+        real_socket = socket.socket
+
+        def make_socket(family=socket.AF_INET, *args):
+            if family == socket.AF_INET6:
+                raise OSError(errno.EAFNOSUPPORT, "Address family not supported by protocol")
+            return real_socket(family, *args)
+
+        with patch('socket.socket', side_effect=make_socket):
+            sock = create_connection('example.com', 443, 5, resolver)
+        self.addCleanup(sock.close)
+        self.assertEqual(sock.getpeername(), address)
+
+    def test_raises_last_error(self):
+        resolver = self.resolver_for(self.closed_port())
+        with self.assertRaises(ConnectionRefusedError):
+            create_connection('example.com', 443, 5, resolver)
+        # The cached answer led nowhere, so the next connect resolves the name again.
+        resolver.forget.assert_called_once_with('example.com', 443)
+
+    def test_session_uses_its_resolver(self):
+        address = self.listen()
+        resolver = self.resolver_for(address)
+        session = Session(ConnectionPool(), timeout=1, redirect_cache=RedirectCache(), resolver=resolver)
+        self.addCleanup(session.close)
+        with self.assertRaises(TimeoutError):
+            # Nothing answers on the listener; connecting is all that matters here.
+            session.get(f'http://example.com:{address[1]}/', timeout=0.2)
+        resolver.resolve.assert_called_once_with('example.com', address[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from exceptions import ConnectionError
+from requests.download import download, split_range, parse_content_range
+from requests.pool import ConnectionPool
+from requests.session import Session, RedirectCache
+
+DATA = bytes(range(256)) * 400
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    data = DATA
+    etag = '"v1"'
+    ranges = True
+    # The connection drops once the body reaches this offset of the file.
+    cut = None
+
+    def do_GET(self):
+        self.server.seen.append(self.headers.get('Range'))
+        self.server.if_range.append(self.headers.get('If-Range'))
+        match = re.fullmatch(r'bytes=(\d+)-(\d*)', self.headers.get('Range') or '')
+        if_range = self.headers.get('If-Range')
+        if not self.ranges or match is None or (if_range and if_range != self.etag):
+            return self.reply(200, self.data)
+        first = int(match.group(1))
+        last = min(int(match.group(2) or len(self.data) - 1), len(self.data) - 1)
+        if first >= len(self.data):
+            return self.reply(416, b"", {'Content-Range': f"bytes */{len(self.data)}"})
+        self.reply(206, self.data[first:last + 1], {'Content-Range': f"bytes {first}-{last}/{len(self.data)}"}, first)
+
+    def reply(self, status, body, headers=None, offset=0):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', self.etag)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.cut is not None and offset <= self.cut < offset + len(body):
+            body = body[:self.cut - offset]
+            self.close_connection = True
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHelpers(unittest.TestCase):
+
+    def test_split_range(self):
+        self.assertEqual(split_range(10, 20, 3), [(10, 13), (14, 16), (17, 19)])
+        self.assertEqual(split_range(0, 2, 8), [(0, 0), (1, 1)])
+
+    def test_parse_content_range(self):
+        self.assertEqual(parse_content_range('bytes 0-99/1000'), (0, 99, 1000))
+        self.assertEqual(parse_content_range('bytes 5-9/*'), (5, 9, None))
+
+
+class TestDownload(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = type('Handler', (RangeHandler,), {})
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self.handler)
+        self.server.seen = []
+        self.server.if_range = []
+        threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/file.bin"
+        self.session = Session(ConnectionPool(), timeout=5, redirect_cache=RedirectCache())
+        self.addCleanup(self.session.close)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'file.bin')
+
+    def read(self):
+        with open(self.path, 'rb') as file:
+            return file.read()
+
+    def test_ranges_are_fetched_in_parallel(self):
+        size = download(self.url, self.path, connections=4, session=self.session, min_part_size=10000)
+        self.assertEqual(size, len(DATA))
+        self.assertEqual(self.read(), DATA)
+        self.assertEqual(sorted(self.server.seen), sorted([
+            'bytes=0-9999', 'bytes=10000-33099', 'bytes=33100-56199', 'bytes=56200-79299', 'bytes=79300-102399'
+        ]))
+
+    def test_mmap(self):
+        download(self.url, self.path, session=self.session, use_mmap=True, min_part_size=30000)
+        self.assertEqual(self.read(), DATA)
+
+    def test_server_without_ranges(self):
+        self.handler.ranges = False
+        self.assertEqual(download(self.url, self.path, session=self.session, min_part_size=10000), len(DATA))
+        self.assertEqual(self.read(), DATA)
+        self.assertEqual(len(self.server.seen), 1)
+
+    def test_empty_file(self):
+        self.handler.data = b""
+        self.assertEqual(download(self.url, self.path, session=self.session), 0)
+        self.assertEqual(self.read(), b"")
+
+    def fail_at(self, offset, **kwargs):
+        self.handler.cut = offset
+        with self.assertRaises(ConnectionError):
+            download(self.url, self.path, session=self.session, min_part_size=10000, **kwargs)
+        self.handler.cut = None
+        self.server.seen.clear()
+        self.server.if_range.clear()
+
+    def checkpoint(self):
+        with open(self.path + '.part.json', encoding='utf-8') as file:
+            return json.load(file)
+
+    def test_failed_download_resumes_from_checkpoint(self):
+        self.fail_at(40000)
+        self.assertFalse(os.path.exists(self.path))
+        state = self.checkpoint()
+        self.assertEqual((state['url'], state['validator'], state['total']), (self.url, '"v1"', len(DATA)))
+        first, last, done = state['parts'][2]
+        self.assertEqual((first, last), (33100, 56199))
+        self.assertLessEqual(done, 40000 - first)
+        self.assertEqual(download(self.url, self.path, session=self.session, min_part_size=10000), len(DATA))
+        self.assertEqual(self.read(), DATA)
+        self.assertEqual(self.server.seen, [f"bytes={first + done}-{last}"])
+        self.assertEqual(self.server.if_range, ['"v1"'])
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['file.bin'])
+
+    def test_changed_file_is_downloaded_again(self):
+        self.fail_at(40000)
+        self.handler.etag = '"v2"'
+        self.assertEqual(download(self.url, self.path, session=self.session, min_part_size=10000), len(DATA))
+        self.assertEqual(self.read(), DATA)
+        self.assertIn('bytes=0-9999', self.server.seen)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['file.bin'])
+
+    def test_body_of_unknown_size_resumes(self):
+        self.handler.ranges = False
+        self.fail_at(50000)
+        self.assertEqual(self.checkpoint()['parts'][0][:2], [0, None])
+        self.handler.ranges = True
+        self.assertEqual(download(self.url, self.path, session=self.session), len(DATA))
+        self.assertEqual(self.read(), DATA)
+        self.assertEqual(len(self.server.seen), 1)
+        self.assertRegex(self.server.seen[0], r'bytes=\d+-$')
+
+    def test_without_resume_nothing_is_kept(self):
+        self.fail_at(40000, resume=False)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), [])
+
+    def test_changed_file_fails_without_leaving_partial_output(self):
+        self.handler.etag = '"v2"'
+        original = RangeHandler.do_GET
+
+        def do_GET(handler):
+            # The entity changes right after the first part was served.
+            original(handler)
+            self.handler.etag = '"v3"'
+
+        self.handler.do_GET = do_GET
+        with self.assertRaises(ConnectionError):
+            download(self.url, self.path, session=self.session, min_part_size=10000)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
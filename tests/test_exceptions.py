@@ -1,5 +1,6 @@
 import unittest
-from exceptions import InvalidParamError, TimeoutError, ConnectionError, RedirectError, ResponseDecodeError
+from exceptions import InvalidParamError, TimeoutError, ConnectionError, RedirectError, ResponseDecodeError, \
+    EntityChangedError
 
 
 class TestHttpClientErrors(unittest.TestCase):
@@ -54,6 +55,11 @@ class TestHttpClientErrors(unittest.TestCase):
         self.assertEqual(error.message, message)
         self.assertIsInstance(error, ResponseDecodeError)
 
+    def test_entity_changed_error(self):
+        error = EntityChangedError()
+        self.assertEqual(error.message, "The resource changed during the download")
+        self.assertIsInstance(error, ConnectionError)
+
 
 if __name__ == "__main__":
     unittest.main()
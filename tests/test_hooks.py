@@ -0,0 +1,99 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from exceptions import InvalidParamError, ConnectionError
+from requests.hooks import Hooks
+from requests.metrics import MetricsCollector, format_labels
+from requests.pool import ConnectionPool
+from requests.session import Session, RedirectCache
+from tests.helpers import socket_pair, serve_in_thread
+
+
+class TestHooks(unittest.TestCase):
+
+    def test_register_and_emit(self):
+        hooks = Hooks()
+        handler = MagicMock()
+        hooks.register('retry', handler)
+        hooks.emit('retry', host='example.com', port=443, reason='empty_response')
+        handler.assert_called_once_with(host='example.com', port=443, reason='empty_response')
+
+        hooks.unregister('retry', handler)
+        hooks.emit('retry', host='example.com', port=443, reason='empty_response')
+        handler.assert_called_once()
+
+    def test_unknown_event(self):
+        with self.assertRaises(InvalidParamError):
+            Hooks().register('on_everything', MagicMock())
+
+
+class TestSessionEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.hooks = Hooks()
+        self.events = []
+        for event in ('request_start', 'connection_acquired', 'headers_received', 'response_done', 'error',
+                      'redirect', 'retry'):
+            self.hooks.register(event, lambda event=event, **details: self.events.append(event))
+        self.session = Session(ConnectionPool(), timeout=1, redirect_cache=RedirectCache(), hooks=self.hooks)
+        self.addCleanup(self.session.close)
+
+    def test_events_in_order(self):
+        client = serve_in_thread(self, b"HTTP/1.1 302 Found\r\nLocation: /b\r\nContent-Length: 0\r\n\r\n",
+                                 b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+        with patch('requests.session.connect', return_value=client):
+            self.session.get('https://example.com/a')
+        self.assertEqual(self.events, [
+            'request_start',
+            'connection_acquired', 'headers_received', 'response_done', 'redirect',
+            'connection_acquired', 'headers_received', 'response_done',
+        ])
+
+    def test_streamed_response_done_after_body(self):
+        client, server = socket_pair(self)
+        server.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 4\r\n\r\nok")
+        with patch('requests.session.connect', return_value=client):
+            response = self.session.get('https://example.com/', stream=True)
+            self.assertNotIn('response_done', self.events)
+            server.sendall(b"!!")
+            self.assertEqual(response.content, b"ok!!")
+        self.assertEqual(self.events[-1], 'response_done')
+
+    def test_error_event(self):
+        with patch('requests.session.connect', side_effect=ConnectionError("refused")):
+            with self.assertRaises(ConnectionError):
+                self.session.get('https://example.com/')
+        self.assertEqual(self.events, ['request_start', 'error'])
+
+
+class TestMetricsCollector(unittest.TestCase):
+
+    def test_render(self):
+        hooks = Hooks()
+        collector = MetricsCollector(buckets=(0.1, 1)).attach(hooks)
+        timings = MagicMock(method='GET', status_code=200, bytes_sent=10, bytes_received=20, total=0.5, ttfb=0.05)
+
+        hooks.emit('request_start', method='GET', url='https://example.com/')
+        hooks.emit('connection_acquired', host='example.com', port=443, reused=True)
+        hooks.emit('response_done', timings=timings)
+        hooks.emit('error', method='GET', url='https://example.com/', error=ConnectionError())
+        collector.detach(hooks)
+        hooks.emit('request_start', method='GET', url='https://example.com/')
+
+        text = collector.render()
+        self.assertIn('# TYPE http_client_requests_total counter\nhttp_client_requests_total{method="GET"} 1\n', text)
+        self.assertIn('http_client_connections_total{reused="true"} 1\n', text)
+        self.assertIn('http_client_responses_total{method="GET",status="200"} 1\n', text)
+        self.assertIn('http_client_errors_total{method="GET",type="ConnectionError"} 1\n', text)
+        self.assertIn('http_client_request_duration_seconds_bucket{method="GET",le="0.1"} 0\n', text)
+        self.assertIn('http_client_request_duration_seconds_bucket{method="GET",le="1.0"} 1\n', text)
+        self.assertIn('http_client_request_duration_seconds_bucket{method="GET",le="+Inf"} 1\n', text)
+        self.assertIn('http_client_request_duration_seconds_sum{method="GET"} 0.5\n', text)
+        self.assertIn('http_client_ttfb_seconds_count{method="GET"} 1\n', text)
+
+    def test_format_labels_escapes(self):
+        self.assertEqual(format_labels([('a', 'x"y\\z')]), '{a="x\\"y\\\\z"}')
+        self.assertEqual(format_labels([]), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
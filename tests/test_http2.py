@@ -0,0 +1,132 @@
+import socket
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from exceptions import InvalidParamError
+from requests.http2 import HTTP2Connection, HTTP2Pool, available, http1_head
+from requests.pool import ConnectionPool
+from requests.session import Session, RedirectCache
+
+if available():
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.settings
+
+
+class H2Socket(socket.socket):
+    def selected_alpn_protocol(self):
+        return 'h2'
+
+
+def serve(sock, requests=None, max_streams=None):
+    # A minimal HTTP/2 server: every stream is answered with its path once its request ends.
+    conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding='utf-8'))
+    conn.initiate_connection()
+    if max_streams is not None:
+        conn.update_settings({h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: max_streams})
+    sock.sendall(conn.data_to_send())
+    streams = {}
+    try:
+        while data := sock.recv(65536):
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    streams[event.stream_id] = [dict(event.headers), b""]
+                elif isinstance(event, h2.events.DataReceived):
+                    streams[event.stream_id][1] += event.data
+                    conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                elif isinstance(event, h2.events.StreamEnded):
+                    headers, body = streams.pop(event.stream_id)
+                    if requests is not None:
+                        requests.append((headers, body))
+                    content = headers[':path'].encode() + b" " + str(len(body)).encode()
+                    conn.send_headers(event.stream_id, [(':status', '200'), ('content-type', 'text/plain'),
+                                                        ('set-cookie', 'sid=1')])
+                    conn.send_data(event.stream_id, content, end_stream=True)
+            sock.sendall(conn.data_to_send())
+    except (BrokenPipeError, ConnectionResetError):
+        # The client hung up.
+        return
+
+
+@unittest.skipUnless(available(), "the optional h2 package is not installed")
+class TestHTTP2(unittest.TestCase):
+
+    def setUp(self):
+        client, self.server = socket.socketpair()
+        self.client = H2Socket(fileno=client.detach())
+        self.requests = []
+        self.thread = threading.Thread(target=serve, args=(self.server, self.requests))
+        self.thread.start()
+        self.addCleanup(self.server.close)
+        self.addCleanup(self.thread.join)
+
+    def test_concurrent_streams_share_one_connection(self):
+        conn = HTTP2Connection(self.client)
+        self.addCleanup(conn.close)
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(
+                lambda i: conn.request('GET', 'example.com', f'/{i}', {'Accept': '*/*'}, timeout=1), range(50)
+            ))
+        self.assertEqual([content for _, _, content in results], [f"/{i} 0".encode() for i in range(50)])
+        self.assertEqual(len(self.requests), 50)
+
+    def test_server_stream_limit_is_respected(self):
+        self.addCleanup(self.client.close)
+        client, server = socket.socketpair()
+        client = H2Socket(fileno=client.detach())
+        thread = threading.Thread(target=serve, args=(server, None, 2))
+        thread.start()
+        self.addCleanup(server.close)
+        self.addCleanup(thread.join)
+        conn = HTTP2Connection(client)
+        self.addCleanup(conn.close)
+        # The first response also brings the server's settings.
+        conn.request('GET', 'example.com', '/first', timeout=1)
+        with ThreadPoolExecutor(16) as executor:
+            results = list(executor.map(lambda i: conn.request('GET', 'example.com', f'/{i}', timeout=2), range(300)))
+        self.assertEqual([content for _, _, content in results], [f"/{i} 0".encode() for i in range(300)])
+
+    def test_body_is_sent_in_data_frames(self):
+        conn = HTTP2Connection(self.client)
+        self.addCleanup(conn.close)
+        body = b"x" * 200000
+        status_code, headers, content = conn.request('POST', 'example.com', '/upload', None, [body], timeout=1)
+        self.assertEqual(status_code, 200)
+        self.assertEqual(content, b"/upload 200000")
+        self.assertEqual(self.requests[0][1], body)
+
+    def test_session_negotiates_http2(self):
+        session = Session(ConnectionPool(), timeout=1, redirect_cache=RedirectCache(), http2=True,
+                          http2_pool=HTTP2Pool())
+        self.addCleanup(session.close)
+        with patch('requests.session.connect', return_value=self.client) as connect:
+            first = session.get('https://example.com/a', headers={'Connection': 'keep-alive'})
+            second = session.post('https://example.com/b', data={'k': 'v'})
+        connect.assert_called_once()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.content, b"/a 0")
+        self.assertEqual(first.headers['content-type'], 'text/plain')
+        self.assertEqual(second.content, b"/b 3")
+        self.assertTrue(second.timings.reused)
+        headers = self.requests[1][0]
+        self.assertEqual(headers[':authority'], 'example.com')
+        self.assertEqual(headers['cookie'], 'sid=1')
+        self.assertNotIn('connection', self.requests[0][0])
+
+
+class TestHelpers(unittest.TestCase):
+
+    def test_http1_head(self):
+        self.assertEqual(http1_head(200, [(b"content-length", b"9"), (b"a", b"1")], 2),
+                         b"HTTP/2 200\r\na: 1\r\nContent-Length: 2\r\n\r\n")
+
+    def test_session_requires_h2(self):
+        with patch('requests.session.http2_available', return_value=False):
+            with self.assertRaises(InvalidParamError):
+                Session(http2=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
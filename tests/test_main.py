@@ -1,6 +1,12 @@
+import io
+import json
+import os
+import tempfile
+import threading
 import unittest
-from unittest.mock import patch, MagicMock, mock_open
+from unittest.mock import patch, MagicMock, mock_open, call
 from response import Response
+from exceptions import ConnectionError
 import main
 
 class TestHttpClient(unittest.TestCase):
@@ -14,7 +20,7 @@ class TestHttpClient(unittest.TestCase):
 
         response = main.get("http://testurl.com")
         self.assertEqual(response.status_code, 200)
-        mock_http_get.assert_called_once_with("http://testurl.com", {}, {}, 1000)
+        mock_http_get.assert_called_once_with("http://testurl.com", {}, {}, 1000, stream=False)
 
     @patch('main.http_post')
     def test_post(self, mock_http_post):
@@ -26,7 +32,7 @@ class TestHttpClient(unittest.TestCase):
         response = main.post("http://testurl.com", data='test_data')
 
         self.assertEqual(response.status_code, 201)
-        mock_http_post.assert_called_once_with("http://testurl.com", 'test_data', {}, {}, 1000)
+        mock_http_post.assert_called_once_with("http://testurl.com", 'test_data', {}, {}, 1000, stream=False, compress=None)
 
     @patch('main.http_put')
     def test_put(self, mock_http_put):
@@ -37,7 +43,7 @@ class TestHttpClient(unittest.TestCase):
         response = main.put("http://testurl.com", data='test_data')
 
         self.assertEqual(response.status_code, 204)
-        mock_http_put.assert_called_once_with("http://testurl.com", 'test_data', {}, {}, 1000)
+        mock_http_put.assert_called_once_with("http://testurl.com", 'test_data', {}, {}, 1000, stream=False, compress=None)
 
     @patch('main.http_delete')
     def test_delete(self, mock_http_delete):
@@ -48,7 +54,7 @@ class TestHttpClient(unittest.TestCase):
         response = main.delete("http://testurl.com")
 
         self.assertEqual(response.status_code, 200)
-        mock_http_delete.assert_called_once_with("http://testurl.com", {}, {}, 1000)
+        mock_http_delete.assert_called_once_with("http://testurl.com", {}, {}, 1000, stream=False)
 
     @patch('main.save_response_as_html')
     @patch('main.http_get')
@@ -61,28 +67,77 @@ class TestHttpClient(unittest.TestCase):
         response = main.get("http://testurl.com", save=True)
 
         self.assertEqual(response.status_code, 200)
-        mock_save_response_as_html.assert_called_once_with(mock_response)
-
-    @patch('os.listdir')
-    @patch('os.path.isfile')
-    def test_count_files(self, mock_isfile, mock_listdir):
-        mock_listdir.return_value = ['file1.txt', 'file2.txt', 'directory1']
-        mock_isfile.side_effect = lambda x: 'file' in x
-        count = main.count_files('test_directory')
-        self.assertEqual(count, 2)
-
-    @patch('os.makedirs')
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('os.path.exists')
-    @patch('main.count_files', return_value=0)
-    def test_save_response_as_html(self, mock_count_files, mock_exists, mock_open_file, mock_makedirs):
-        mock_exists.return_value = False
-        mock_response = MagicMock()
-        mock_response.get_content.return_value = 'Test content'
-        main.save_response_as_html(mock_response)
-        mock_makedirs.assert_called_once_with('html')
-        mock_open_file.assert_called_once_with('html/saved_contents0.html', 'w', encoding='utf-8')
-        mock_open_file().write.assert_called_once_with('Test content')
+        mock_http_get.assert_called_once_with("http://testurl.com", {}, {}, 1000, stream=True)
+        mock_save_response_as_html.assert_called_once_with(mock_response, False, 'html')
+
+    def test_save_response_as_html(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output_dir = os.path.join(directory, 'html')
+            mock_response = MagicMock()
+            main.save_response_as_html(mock_response, fsync=True, output_dir=output_dir)
+            main.save_response_as_html(mock_response, output_dir=output_dir)
+            self.assertEqual(mock_response.save.call_args_list, [
+                call(os.path.join(output_dir, 'saved_contents0.html'), True),
+                call(os.path.join(output_dir, 'saved_contents1.html'), False),
+            ])
+
+    def test_reserve_filename_skips_taken_names(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for index in range(5):
+                open(main.saved_file_path(directory, index), 'w').close()
+            self.assertEqual(main.reserve_filename(directory), main.saved_file_path(directory, 5))
+            # A stale counter must not hand out a name that already exists.
+            with open(os.path.join(directory, main.COUNTER_FILE), 'w') as f:
+                f.write('2')
+            self.assertEqual(main.reserve_filename(directory), main.saved_file_path(directory, 6))
+            self.assertTrue(os.path.exists(main.saved_file_path(directory, 6)))
+
+    @patch('main.http_post')
+    @patch('main.http_get')
+    def test_run_batch(self, mock_http_get, mock_http_post):
+        mock_http_get.return_value = Response(b'hello', 200, {'Content-Type': 'text/plain'})
+        mock_http_post.side_effect = ConnectionError("refused")
+        lines = [
+            '{"url": "https://example.com/a"}\n',
+            '\n',
+            '{"method": "post", "url": "https://example.com/b", "data": {"k": "v"}, "headers": {"X": "1"}}\n',
+            '{"method": "PATCH", "url": "https://example.com/c"}\n',
+        ]
+        output = io.StringIO()
+
+        main.run_batch(lines, output, workers=2, per_host=1, timeout=5)
+
+        results = sorted((json.loads(line) for line in output.getvalue().splitlines()), key=lambda r: r['index'])
+        self.assertEqual([r['index'] for r in results], [0, 2, 3])
+        self.assertEqual(results[0]['status_code'], 200)
+        self.assertEqual(results[0]['body'], 'hello')
+        self.assertEqual(results[1]['error'], 'refused')
+        self.assertIn('Unsupported method', results[2]['error'])
+        mock_http_get.assert_called_once_with('https://example.com/a', {}, {}, 5)
+        mock_http_post.assert_called_once_with('https://example.com/b', {'k': 'v'}, {'X': '1'}, {}, 5, compress=None)
+
+    @patch('main.http_get')
+    def test_run_batch_busy_host_does_not_hold_workers(self, mock_http_get):
+        other_done = threading.Event()
+        waited = []
+
+        def get(url, *args):
+            if 'other.com' in url:
+                other_done.set()
+            else:
+                # Requests to the busy host only finish once the other host was served.
+                waited.append(other_done.wait(2))
+            return Response(b'', 200, {})
+
+        mock_http_get.side_effect = get
+        lines = [json.dumps({'url': f'https://busy.com/{i}'}) for i in range(3)]
+        lines.append(json.dumps({'url': 'https://other.com/'}))
+        output = io.StringIO()
+
+        main.run_batch(lines, output, workers=2, per_host=1, timeout=5)
+
+        self.assertEqual(waited, [True, True, True])
+        self.assertEqual(len(output.getvalue().splitlines()), 4)
 
     def test_param_str_to_dict(self):
         result = main.param_str_to_dict("key1:value1;key2:value2;key3=value3")
@@ -0,0 +1,91 @@
+import unittest
+from exceptions import ConnectionError, ResponseDecodeError
+from requests.parser import ResponseParser
+
+
+def feed_all(parser, data, step=None):
+    body = b""
+    step = step or len(data)
+    for start in range(0, len(data), step):
+        piece = data[start:start + step]
+        for a, b in parser.feed(piece):
+            body += piece[a:b]
+    return body
+
+
+class TestResponseParser(unittest.TestCase):
+
+    def test_content_length(self):
+        parser = ResponseParser()
+        body = feed_all(parser, b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: 5\r\n\r\nHello")
+        self.assertTrue(parser.complete)
+        self.assertEqual(body, b"Hello")
+        self.assertEqual(parser.status_code, 200)
+        self.assertEqual(parser.reason, "OK")
+        self.assertEqual(parser.headers, {"Content-Type": "text/plain", "Content-Length": "5"})
+        self.assertFalse(parser.will_close)
+
+    def test_stops_at_message_end(self):
+        parser = ResponseParser()
+        data = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nHiHTTP/1.1 200 OK\r\n"
+        spans = parser.feed(data)
+        self.assertEqual(spans, [(38, 40)])
+        self.assertEqual(parser.consumed, 40)
+
+    def test_chunked_byte_by_byte(self):
+        parser = ResponseParser()
+        data = b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n5;ext=1\r\nHello\r\nA\r\n, World!!!\r\n0\r\nX-Trailer: 1\r\n\r\n"
+        self.assertEqual(feed_all(parser, data, step=1), b"Hello, World!!!")
+        self.assertTrue(parser.complete)
+        self.assertEqual(parser.consumed, len(data))
+
+    def test_close_delimited(self):
+        parser = ResponseParser()
+        body = feed_all(parser, b"HTTP/1.1 200 OK\r\n\r\nHello")
+        self.assertFalse(parser.complete)
+        self.assertTrue(parser.will_close)
+        parser.feed_eof()
+        self.assertTrue(parser.complete)
+        self.assertEqual(body, b"Hello")
+
+    def test_no_body_statuses_and_head(self):
+        for status, method in ((204, 'GET'), (304, 'GET'), (200, 'HEAD')):
+            parser = ResponseParser(method)
+            parser.feed(f"HTTP/1.1 {status} X\r\nContent-Length: 10\r\n\r\n".encode())
+            self.assertTrue(parser.complete)
+
+    def test_interim_response(self):
+        parser = ResponseParser()
+        data = b"HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 201 Created\r\nContent-Length: 0\r\n\r\n"
+        parser.feed(data)
+        self.assertTrue(parser.complete)
+        self.assertEqual(parser.status_code, 201)
+        self.assertEqual(data[parser.head_start:parser.head_end], b"HTTP/1.1 201 Created\r\nContent-Length: 0\r\n\r\n")
+
+    def test_connection_close_and_http10(self):
+        parser = ResponseParser()
+        parser.feed(b"HTTP/1.1 200 OK\r\nConnection: close\r\nContent-Length: 0\r\n\r\n")
+        self.assertTrue(parser.will_close)
+        parser = ResponseParser()
+        parser.feed(b"HTTP/1.0 200 OK\r\nContent-Length: 0\r\n\r\n")
+        self.assertTrue(parser.will_close)
+
+    def test_truncated_body(self):
+        parser = ResponseParser()
+        parser.feed(b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nHel")
+        with self.assertRaises(ConnectionError):
+            parser.feed_eof()
+
+    def test_invalid_input(self):
+        with self.assertRaises(ResponseDecodeError):
+            ResponseParser().feed(b"HTTP/1.1 Invalid Status\r\n")
+        with self.assertRaises(ResponseDecodeError):
+            ResponseParser().feed(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n")
+        with self.assertRaises(ResponseDecodeError):
+            ResponseParser().feed(b"HTTP/1.1 200 OK\r\nContent-Length: x\r\n\r\n")
+        with self.assertRaises(ResponseDecodeError):
+            ResponseParser().feed(b"HTTP/1.1 200 OK\r\nContent-Length: -5\r\n\r\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
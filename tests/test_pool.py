@@ -0,0 +1,193 @@
+import os
+import socket
+import unittest
+from unittest.mock import MagicMock
+from exceptions import ConnectionError, InvalidParamError
+from requests.pool import ConnectionPool, PooledConnection
+
+
+RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nHello"
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = ConnectionPool(max_per_host=1, idle_timeout=30)
+        self.addCleanup(self.pool.clear)
+
+    def make_pair(self):
+        client, server = socket.socketpair()
+        self.addCleanup(server.close)
+        return client, server
+
+    def test_acquire_reuses_idle_connection(self):
+        client, _ = self.make_pair()
+        conn = self.pool.acquire('example.com', 443, lambda: client)
+        self.assertFalse(conn.reused)
+        self.pool.release(conn)
+
+        connect = MagicMock()
+        reused = self.pool.acquire('example.com', 443, connect)
+        self.assertIs(reused.sock, client)
+        self.assertTrue(reused.reused)
+        connect.assert_not_called()
+
+    def test_acquire_drops_connection_closed_by_server(self):
+        client, server = self.make_pair()
+        self.pool.release(PooledConnection(client, ('example.com', 443, None)))
+        server.close()
+
+        fresh = MagicMock()
+        conn = self.pool.acquire('example.com', 443, lambda: fresh)
+        self.assertIs(conn.sock, fresh)
+        self.assertFalse(conn.reused)
+
+    def test_idle_connection_with_high_descriptor_is_reused(self):
+        client, _ = self.make_pair()
+        try:
+            fd = os.dup2(client.fileno(), 1500)
+        except OSError:
+            self.skipTest("descriptor 1500 is not available")
+        high = socket.socket(fileno=fd)
+        self.addCleanup(high.close)
+        self.assertTrue(PooledConnection(high, ('example.com', 443, None)).is_alive())
+
+    def test_acquire_drops_expired_connection(self):
+        client, _ = self.make_pair()
+        conn = PooledConnection(client, ('example.com', 443, None))
+        self.pool.release(conn)
+        conn.last_used -= 60
+
+        fresh = MagicMock()
+        self.assertIs(self.pool.acquire('example.com', 443, lambda: fresh).sock, fresh)
+
+    def test_connections_are_keyed_by_tls_config(self):
+        client, _ = self.make_pair()
+        self.pool.release(PooledConnection(client, ('example.com', 443, (False, None))))
+        fresh = MagicMock()
+        self.assertIs(self.pool.acquire('example.com', 443, lambda: fresh).sock, fresh)
+        self.assertIs(self.pool.acquire('example.com', 443, MagicMock(), (False, None)).sock, client)
+
+    def test_release_respects_max_per_host(self):
+        first, _ = self.make_pair()
+        second, _ = self.make_pair()
+        self.pool.release(PooledConnection(first, ('example.com', 443, None)))
+        self.pool.release(PooledConnection(second, ('example.com', 443, None)))
+        self.assertEqual(self.pool.idle_count('example.com', 443), 1)
+        self.assertEqual(second.fileno(), -1)
+
+    def test_exchange_keeps_framed_response(self):
+        client, server = self.make_pair()
+        server.sendall(RESPONSE)
+        parser, head, body = self.pool.exchange('example.com', 443, lambda: client, lambda sock: None)
+        self.assertEqual((parser.status_code, head + body), (200, RESPONSE))
+        self.assertEqual(self.pool.idle_count('example.com', 443), 1)
+
+    def test_exchange_discards_connection_close(self):
+        client, server = self.make_pair()
+        server.sendall(b"HTTP/1.1 200 OK\r\nConnection: close\r\n\r\nHello")
+        server.close()
+        self.pool.exchange('example.com', 443, lambda: client, lambda sock: None)
+        self.assertEqual(self.pool.idle_count('example.com', 443), 0)
+
+    def test_stream_returns_connection_when_exhausted(self):
+        client, server = self.make_pair()
+        client.settimeout(1)
+        server.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\nHello")
+        head, raw = self.pool.stream('example.com', 443, lambda: client, lambda sock: None)
+        self.assertEqual(head, b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n")
+        self.assertEqual(self.pool.idle_count('example.com', 443), 0)
+        server.sendall(b", You")
+        self.assertEqual(b"".join(raw.iter_chunks()), b"Hello, You")
+        self.assertEqual(self.pool.idle_count('example.com', 443), 1)
+
+    def test_stream_releases_connection_when_body_came_with_head(self):
+        client, server = self.make_pair()
+        server.sendall(RESPONSE)
+        _, raw = self.pool.stream('example.com', 443, lambda: client, lambda sock: None)
+        # Everything is already buffered, so the socket goes back to the pool at once.
+        self.assertEqual(self.pool.idle_count('example.com', 443), 1)
+        self.assertEqual(b"".join(raw.iter_chunks()), b"Hello")
+
+    def test_stream_closed_early_discards_connection(self):
+        client, server = self.make_pair()
+        server.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\nHello")
+        _, raw = self.pool.stream('example.com', 443, lambda: client, lambda sock: None)
+        raw.close()
+        self.assertEqual(self.pool.idle_count('example.com', 443), 0)
+        self.assertEqual(client.fileno(), -1)
+
+    def test_exchange_retries_stale_connection(self):
+        stale = MagicMock()
+        stale.sendall.side_effect = BrokenPipeError()
+        conn = PooledConnection(stale, ('example.com', 443, None))
+        conn.is_alive = lambda: True
+        self.pool.release(conn)
+
+        client, server = self.make_pair()
+        server.sendall(RESPONSE)
+        _, head, body = self.pool.exchange('example.com', 443, lambda: client, lambda sock: sock.sendall(b"GET"))
+        self.assertEqual(head + body, RESPONSE)
+        stale.close.assert_called_once()
+
+    def add_stale(self, sock):
+        conn = PooledConnection(sock, ('example.com', 443, None))
+        conn.is_alive = lambda: True
+        self.pool.release(conn)
+
+    def test_exchange_does_not_retry_non_idempotent_request(self):
+        stale = MagicMock()
+        stale.sendall.side_effect = BrokenPipeError()
+        self.add_stale(stale)
+        connect = MagicMock()
+        with self.assertRaises(ConnectionError):
+            self.pool.exchange('example.com', 443, connect, lambda sock: sock.sendall(b"POST"), method='POST')
+        connect.assert_not_called()
+
+    def test_exchange_does_not_retry_after_request_was_sent(self):
+        stale = MagicMock()
+        stale.recv_into.side_effect = ConnectionResetError()
+        self.add_stale(stale)
+        connect = MagicMock()
+        with self.assertRaises(ConnectionError):
+            self.pool.exchange('example.com', 443, connect, lambda sock: sock.sendall(b"GET"))
+        stale.sendall.assert_called_once_with(b"GET")
+        connect.assert_not_called()
+
+    def test_exchange_retries_empty_response_for_idempotent_request(self):
+        client, server = self.make_pair()
+        server.close()
+        self.add_stale(client)
+        fresh, fresh_server = self.make_pair()
+        fresh_server.sendall(RESPONSE)
+        _, head, body = self.pool.exchange('example.com', 443, lambda: fresh, lambda sock: None, method='DELETE')
+        self.assertEqual(head + body, RESPONSE)
+
+    def test_pipeline_writes_requests_back_to_back(self):
+        client, server = self.make_pair()
+        server.sendall(RESPONSE * 3)
+        requests = [('GET', b"GET /%d\r\n" % i, None) for i in range(3)]
+        responses = self.pool.pipeline('example.com', 443, lambda: client, requests)
+        self.assertEqual([head + body for _, head, body in responses], [RESPONSE] * 3)
+        self.assertEqual(server.recv(1024), b"GET /0\r\nGET /1\r\nGET /2\r\n")
+        self.assertEqual(self.pool.idle_count('example.com', 443), 1)
+
+    def test_pipeline_replays_unanswered_requests(self):
+        client, server = self.make_pair()
+        server.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\nConnection: close\r\n\r\nfirst")
+        fresh, fresh_server = self.make_pair()
+        fresh_server.sendall(RESPONSE)
+        connections = iter([client, fresh])
+        responses = self.pool.pipeline('example.com', 443, lambda: next(connections),
+                                       [('GET', b"GET /1\r\n", None), ('GET', b"GET /2\r\n", None)])
+        self.assertEqual(responses[0][2], b"first")
+        self.assertEqual(responses[1][1] + responses[1][2], RESPONSE)
+        self.assertEqual(fresh_server.recv(1024), b"GET /2\r\n")
+
+    def test_pipeline_rejects_non_idempotent_requests(self):
+        with self.assertRaises(InvalidParamError):
+            self.pool.pipeline('example.com', 443, MagicMock(), [('POST', b"POST", None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
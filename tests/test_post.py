@@ -1,155 +1,45 @@
 import unittest
-from unittest.mock import patch, MagicMock
-from requests.post import (
-    parse_url,
-    build_request,
-    send_request,
-    parse_response,
-    handle_redirects,
-    http_post,
-    Response,
-    ConnectionError,
-    RedirectError
-)
+from exceptions import ConnectionError
+from requests.post import http_post
+from tests.helpers import DefaultSessionTestCase
 
 
-class TestHttpClientFunctions(unittest.TestCase):
+class TestHttpPost(DefaultSessionTestCase):
 
-    def test_parse_url_with_full_path_and_query(self):
-        url = "https://example.com/path?query=1"
-        host, path = parse_url(url)
-        self.assertEqual(host, "example.com")
-        self.assertEqual(path, "/path")  # Путь без параметров запроса
+    def test_http_post_success(self):
+        self.server.sendall(b"HTTP/1.1 201 Created\r\nContent-Length: 7\r\n\r\nCreated")
 
-    def test_build_request(self):
-        request = build_request(
-            host="example.com",
-            path="/path",
-            data="key=value",
-            headers={"Header1": "Value1"},
-            cookies={"cookie1": "value1"}
-        )
-        expected_request = (
-            "POST /path HTTP/1.1\r\n"
-            "Host: example.com\r\n"
-            "Connection: close\r\n"
-            "Content-Length: 9\r\n"
-            "Header1: Value1\r\n"
-            "Cookie: cookie1=value1\r\n"
-            "\r\n"
-            "key=value"
-        )
-        self.assertEqual(request, expected_request)
-
-    @patch('requests.post.socket.create_connection')
-    @patch('requests.post.ssl.create_default_context')
-    def test_send_request(self, mock_ssl_context, mock_create_connection):
-        mock_sock = MagicMock()
-        mock_create_connection.return_value = mock_sock
-        mock_ssl_context.return_value.wrap_socket.return_value = mock_sock
+        response = http_post("https://example.com/path?x=1", {"key": "value"}, {"Header1": "Value1"})
 
-        mock_sock.recv.side_effect = [b"HTTP/1.1 200 OK\r\nContent-Length: 12\r\n\r\nHello, world!", b""]
-        response = send_request("example.com", "POST /path HTTP/1.1\r\n", 1000)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.contents, "Created")
+        self.assertEqual(self.server.recv(1024), (
+            b"POST /path?x=1 HTTP/1.1\r\nHost: example.com\r\nConnection: keep-alive\r\n"
+            b"Content-Length: 9\r\nHeader1: Value1\r\nAccept-Encoding: gzip, deflate\r\n\r\nkey=value"
+        ))
 
-        self.assertEqual(response, b"HTTP/1.1 200 OK\r\nContent-Length: 12\r\n\r\nHello, world!")
-
-    def test_parse_response(self):
-        response_bytes = (
-            b"HTTP/1.1 200 OK\r\n"
-            b"Content-Type: text/html; charset=utf-8\r\n"
-            b"Content-Length: 12\r\n"
-            b"\r\n"
-            b"Hello, world!"
-        )
-        response = parse_response(response_bytes)
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.contents, "Hello, world!")
-        self.assertEqual(response.headers, {
-            "Content-Type": "text/html; charset=utf-8",
-            "Content-Length": "12"
-        })
-
-    def test_handle_redirects(self):
-        new_url, redirect_count = handle_redirects(
-            url="https://example.com",
-            headers={"Location": "https://new-example.com"},
-            redirect_count=0,
-            max_redirects=5
-        )
-        self.assertEqual(new_url, "https://new-example.com")
-        self.assertEqual(redirect_count, 1)
-
-        new_url, redirect_count = handle_redirects(
-            url="https://example.com",
-            headers={"Location": "/new-path"},
-            redirect_count=0,
-            max_redirects=5
-        )
-        self.assertEqual(new_url, "https://example.com/new-path")
-        self.assertEqual(redirect_count, 1)
+    def test_http_post_counts_encoded_bytes(self):
+        self.server.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n")
+        http_post("https://example.com/", "héllo")
+        self.assertIn(b"Content-Length: 6\r\n", self.server.recv(1024))
 
-    @patch('requests.post.send_request')
-    @patch('requests.post.parse_response')
-    def test_http_post_success(self, mock_parse_response, mock_send_request):
-        mock_send_request.return_value = (
-            b"HTTP/1.1 200 OK\r\n"
-            b"Content-Length: 12\r\n"
-            b"\r\n"
-            b"Hello, world!"
+    def test_http_post_see_other_switches_to_get(self):
+        servers = self.serve(
+            b"HTTP/1.1 303 See Other\r\nLocation: /result\r\nConnection: close\r\nContent-Length: 0\r\n\r\n",
+            b"HTTP/1.1 200 OK\r\nContent-Length: 4\r\n\r\ndone"
         )
-        mock_parse_response.return_value = Response("Hello, world!", 200, {})
-
-        response = http_post("https://example.com", data={"key": "value"})
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.contents, "Hello, world!")
-
-    @patch('requests.post.send_request')
-    def test_http_post_connection_error(self, mock_send_request):
-        mock_send_request.side_effect = Exception("Connection failed")
+        response = http_post("https://example.com/form", {"a": "b"})
+        self.assertEqual(response.content, b"done")
+        self.assertTrue(servers[0].recv(4096).endswith(b"a=b"))
+        self.assertEqual(servers[1].recv(4096), (
+            b"GET /result HTTP/1.1\r\nHost: example.com\r\nConnection: keep-alive\r\nAccept-Encoding: gzip, deflate\r\n\r\n"
+        ))
+
+    def test_http_post_connection_error(self):
+        self.server.close()
         with self.assertRaises(ConnectionError):
-            http_post("https://example.com", data={"key": "value"})
-
-    @patch('requests.post.send_request')
-    @patch('requests.post.parse_response')
-    def test_http_post_redirect(self, mock_parse_response, mock_send_request):
-        mock_send_request.side_effect = [
-            (
-                b"HTTP/1.1 302 Found\r\n"
-                b"Location: https://example.com/new-location\r\n"
-                b"Content-Length: 0\r\n"
-                b"\r\n"
-            ),
-            (
-                b"HTTP/1.1 200 OK\r\n"
-                b"Content-Length: 12\r\n"
-                b"\r\n"
-                b"Hello, world!"
-            )
-        ]
-        mock_parse_response.side_effect = [
-            Response("", 302, {"Location": "https://example.com/new-location"}),
-            Response("Hello, world!", 200, {})
-        ]
-
-        response = http_post("https://example.com", data={"key": "value"})
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.contents, "Hello, world!")
-
-    @patch('requests.post.send_request')
-    @patch('requests.post.parse_response')
-    def test_http_post_max_redirects(self, mock_parse_response, mock_send_request):
-        mock_send_request.return_value = (
-            b"HTTP/1.1 302 Found\r\n"
-            b"Location: https://example.com/new-location\r\n"
-            b"Content-Length: 0\r\n"
-            b"\r\n"
-        )
-        mock_parse_response.return_value = Response("", 302, {"Location": "https://example.com/new-location"})
-
-        with self.assertRaises(RedirectError):
-            http_post("https://example.com", data={"key": "value"}, max_redirects=5)
-
+            http_post("https://example.com/path", {"key": "value"})
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,141 @@
+import socket
+import unittest
+from exceptions import ConnectionError, TimeoutError
+from requests.receive import receive_message, receive_head, ReceiveBuffer, ResponseStream
+
+
+class TestReceive(unittest.TestCase):
+
+    def make_pair(self):
+        client, server = socket.socketpair()
+        client.settimeout(1)
+        self.addCleanup(client.close)
+        self.addCleanup(server.close)
+        return client, server
+
+    def test_receive_message_stops_at_content_length(self):
+        client, server = self.make_pair()
+        server.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nHel")
+        server.sendall(b"lo")
+        parser, head, body = receive_message(client)
+        self.assertEqual((parser.status_code, parser.will_close), (200, False))
+        self.assertEqual(head, b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\n")
+        self.assertEqual(body, b"Hello")
+
+    def test_receive_message_reads_until_close(self):
+        client, server = self.make_pair()
+        server.sendall(b"HTTP/1.1 200 OK\r\n\r\nHello")
+        server.close()
+        parser, head, body = receive_message(client)
+        self.assertTrue(parser.will_close)
+        self.assertEqual((head, body), (b"HTTP/1.1 200 OK\r\n\r\n", b"Hello"))
+
+    def test_receive_message_with_small_chunks(self):
+        client, server = self.make_pair()
+        body = bytes(range(256)) * 64
+        server.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+        self.assertEqual(receive_message(client, chunk_size=7)[2], body)
+
+    def test_receive_message_caps_preallocation(self):
+        client, server = self.make_pair()
+        server.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 100000000000000\r\n\r\nHello")
+        server.close()
+        with self.assertRaises(ConnectionError):
+            receive_message(client)
+
+    def test_receive_message_decodes_chunked_body(self):
+        client, server = self.make_pair()
+        server.sendall(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n5\r\nHello\r\n")
+        server.sendall(b"7\r\n, World\r\n0\r\n\r\n")
+        parser, head, body = receive_message(client)
+        self.assertTrue(parser.chunked)
+        self.assertEqual(head, b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n")
+        self.assertEqual(body, b"Hello, World")
+
+    def test_receive_message_skips_interim_response(self):
+        client, server = self.make_pair()
+        server.sendall(b"HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 204 No Content\r\n\r\n")
+        parser, head, body = receive_message(client)
+        self.assertEqual(parser.status_code, 204)
+        self.assertEqual((head, body), (b"HTTP/1.1 204 No Content\r\n\r\n", b""))
+
+    def test_receive_message_does_not_read_past_head_response(self):
+        client, server = self.make_pair()
+        server.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\n")
+        _, head, body = receive_message(client, method='HEAD')
+        self.assertEqual((head, body), (b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\n", b""))
+
+    def test_receive_message_keeps_pipelined_bytes_in_shared_buffer(self):
+        client, server = self.make_pair()
+        server.sendall(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n1\r\na\r\n0\r\n\r\n"
+                       b"HTTP/1.1 200 OK\r\nContent-Length: 1\r\n\r\nbHTTP/1.1 204 No Content\r\n\r\n")
+        buffer = ReceiveBuffer()
+        self.assertEqual(receive_message(client, buffer=buffer)[2], b"a")
+        self.assertEqual(receive_message(client, buffer=buffer)[2], b"b")
+        self.assertEqual(receive_message(client, buffer=buffer)[1:], (b"HTTP/1.1 204 No Content\r\n\r\n", b""))
+        self.assertEqual(buffer.length, 0)
+
+    def test_receive_message_truncated_body(self):
+        client, server = self.make_pair()
+        server.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nHel")
+        server.close()
+        with self.assertRaises(ConnectionError):
+            receive_message(client)
+
+    def test_receive_message_empty(self):
+        client, server = self.make_pair()
+        server.close()
+        self.assertIsNone(receive_message(client))
+
+    def test_receive_head_returns_body_received_with_it(self):
+        client, server = self.make_pair()
+        server.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\nHello")
+        parser, head, pending = receive_head(client)
+        self.assertEqual(parser.status_code, 200)
+        self.assertEqual(head, b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n")
+        self.assertEqual(pending, b"Hello")
+
+    def test_response_stream_reads_to_message_end(self):
+        client, server = self.make_pair()
+        server.sendall(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n")
+        parser, _, pending = receive_head(client)
+        server.sendall(b"5\r\nHello\r\n7\r\n, World\r\n0\r\n\r\n")
+        closed = []
+        stream = ResponseStream(client, parser, pending, 4, closed.append)
+        self.assertEqual(b"".join(stream.iter_chunks()), b"Hello, World")
+        self.assertEqual(closed, [True])
+
+    def test_response_stream_closed_early_is_not_reusable(self):
+        client, server = self.make_pair()
+        server.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\nHello")
+        parser, _, pending = receive_head(client)
+        closed = []
+        stream = ResponseStream(client, parser, pending, on_close=closed.append)
+        stream.close()
+        stream.close()
+        self.assertEqual(closed, [False])
+
+    def test_response_stream_timeout_discards_connection(self):
+        client, server = self.make_pair()
+        client.settimeout(0.05)
+        server.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\nHello")
+        parser, _, pending = receive_head(client)
+        closed = []
+        stream = ResponseStream(client, parser, pending, on_close=closed.append)
+        with self.assertRaises(TimeoutError):
+            list(stream.iter_chunks())
+        self.assertEqual(closed, [False])
+
+    def test_receive_buffer_grows(self):
+        client, server = self.make_pair()
+        server.sendall(b"x" * 100)
+        server.close()
+        buffer = ReceiveBuffer(chunk_size=16)
+        while buffer.fill(client):
+            pass
+        self.assertEqual(buffer.getvalue(), b"x" * 100)
+        self.assertEqual(buffer.find(b"x", 99), 99)
+
+
+if __name__ == '__main__':
+    unittest.main()
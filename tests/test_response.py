@@ -1,4 +1,8 @@
+import os
+import tempfile
 import unittest
+from unittest.mock import MagicMock
+from exceptions import HttpClientError
 from response import Response
 
 class TestResponse(unittest.TestCase):
@@ -27,5 +31,68 @@ class TestResponse(unittest.TestCase):
     def test_content_length(self):
         self.assertEqual(self.response.get_headers()["Content-Length"], "15")
 
+    def test_content_is_bytes(self):
+        self.assertEqual(self.response.content, b"Sample content")
+
+    def test_text_uses_charset(self):
+        response = Response("Привет".encode("cp1251"), 200, {"content-type": "text/plain; charset=\"windows-1251\""})
+        self.assertEqual(response.encoding, "cp1251")
+        self.assertEqual(response.text, "Привет")
+
+    def test_text_defaults_to_utf8(self):
+        response = Response(b"\xd0\x9f\xff", 200, {"Content-Type": "text/plain; charset=unknown"})
+        self.assertEqual(response.encoding, "utf-8")
+        self.assertEqual(response.text, "П\ufffd")
+
+    def test_iter_content_of_buffered_body(self):
+        self.assertEqual(list(self.response.iter_content(6)), [b"Sample", b" conte", b"nt"])
+
+    def test_iter_lines(self):
+        raw = MagicMock()
+        raw.iter_chunks.return_value = iter([b"first\r", b"\nsec", b"ond\nthird"])
+        response = Response(None, 200, {}, raw=raw)
+        self.assertEqual(list(response.iter_lines()), [b"first", b"second", b"third"])
+
+    def test_streamed_content_is_read_once(self):
+        raw = MagicMock()
+        raw.iter_chunks.return_value = iter([b"Hello", b", World"])
+        response = Response(None, 200, {}, raw=raw)
+        self.assertEqual(list(response.iter_content()), [b"Hello", b", World"])
+        with self.assertRaises(HttpClientError):
+            response.content
+
+    def test_close_closes_raw_stream(self):
+        raw = MagicMock()
+        with Response(None, 200, {}, raw=raw):
+            pass
+        raw.close.assert_called_once()
+
+    def test_save_streams_body_to_file(self):
+        raw = MagicMock()
+        raw.iter_chunks.return_value = iter([b"\x00\xff", b"\xfe"])
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "out.bin")
+            Response(None, 200, {}, raw=raw).save(filename, fsync=True)
+            with open(filename, 'rb') as file:
+                self.assertEqual(file.read(), b"\x00\xff\xfe")
+            self.assertEqual(os.listdir(directory), ["out.bin"])
+
+    def test_save_failure_leaves_no_file(self):
+        def chunks():
+            yield b"partial"
+            raise ConnectionError()
+        raw = MagicMock()
+        raw.iter_chunks.return_value = chunks()
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(ConnectionError):
+                Response(None, 200, {}, raw=raw).save(os.path.join(directory, "out.bin"))
+            self.assertEqual(os.listdir(directory), [])
+            raw.close.assert_called_once()
+
+    def test_binary_content_is_preserved(self):
+        body = bytes(range(256))
+        response = Response(body, 200, {})
+        self.assertEqual(response.content, body)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,247 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch, ANY
+from urllib.parse import quote
+from exceptions import InvalidParamError
+from requests.pool import ConnectionPool
+from requests.session import Session, RedirectCache, parse_url, join_url, encode_body, build_request, response_cookies
+
+
+class TestSessionHelpers(unittest.TestCase):
+
+    def test_parse_url(self):
+        self.assertEqual(parse_url("https://example.com"), ("https", "example.com", 443, "example.com", "/"))
+        self.assertEqual(parse_url("https://example.com:8443/a?b=1"),
+                         ("https", "example.com", 8443, "example.com:8443", "/a?b=1"))
+        self.assertEqual(parse_url("HTTP://example.com/"), ("http", "example.com", 80, "example.com", "/"))
+        self.assertEqual(parse_url("http+unix://%2Frun%2FApp.sock/status"),
+                         ("http+unix", "/run/App.sock", None, "localhost", "/status"))
+        with self.assertRaises(InvalidParamError):
+            parse_url("ftp://example.com/")
+
+    def test_join_url(self):
+        self.assertEqual(join_url('https://example.com/a/b', '../c'), 'https://example.com/c')
+        self.assertEqual(join_url('http+unix://%2Ftmp%2Fa.sock/old', '/new?x=1'), 'http+unix://%2Ftmp%2Fa.sock/new?x=1')
+        self.assertEqual(join_url('http+unix://%2Ftmp%2Fa.sock/a/old', 'new'), 'http+unix://%2Ftmp%2Fa.sock/a/new')
+        self.assertEqual(join_url('http+unix://%2Ftmp%2Fa.sock/old', 'https://example.com/'), 'https://example.com/')
+
+    def test_encode_body(self):
+        self.assertEqual(encode_body('POST', {'a': 'b c'}), b'a=b+c')
+        self.assertEqual(encode_body('PUT', 'héllo'), 'héllo'.encode())
+        self.assertEqual(encode_body('POST', None), b'')
+        self.assertIsNone(encode_body('GET', None))
+        self.assertEqual(encode_body('PUT', {'a': 'b', 'c': 'd'}), b'a=b&c=d')
+        self.assertEqual(encode_body('POST', {}), b'')
+        with self.assertRaises(InvalidParamError):
+            encode_body('DELETE', {'a': 'b'})
+
+    def test_build_request(self):
+        request = build_request('POST', 'example.com', '/path', b'key=value', {'Header1': 'Value1'}, {'c': '1'})
+        self.assertEqual(request, (
+            b"POST /path HTTP/1.1\r\nHost: example.com\r\nConnection: keep-alive\r\nContent-Length: 9\r\n"
+            b"Header1: Value1\r\nCookie: c=1\r\n\r\nkey=value"
+        ))
+
+    def test_response_cookies(self):
+        head = b"HTTP/1.1 200 OK\r\nSet-Cookie: a=1; Path=/\r\nset-cookie: b=2\r\nContent-Length: 0"
+        self.assertEqual(response_cookies(head), {'a': '1', 'b': '2'})
+
+
+class TestRedirectCache(unittest.TestCase):
+
+    def test_resolve_follows_cached_hops(self):
+        cache = RedirectCache()
+        cache.add('https://a/1', 'https://a/2')
+        cache.add('https://a/2', 'https://a/3')
+        self.assertEqual(cache.resolve('https://a/1', 5), 'https://a/3')
+        self.assertEqual(cache.resolve('https://a/1', 1), 'https://a/2')
+        self.assertEqual(cache.resolve('https://b/', 5), 'https://b/')
+
+    def test_resolve_stops_on_cycles(self):
+        cache = RedirectCache()
+        cache.add('https://a/1', 'https://a/2')
+        cache.add('https://a/2', 'https://a/1')
+        self.assertEqual(cache.resolve('https://a/1', 3), 'https://a/2')
+
+    def test_evicts_least_recently_used(self):
+        cache = RedirectCache(max_entries=2)
+        cache.add('https://a/1', 'https://a/x')
+        cache.add('https://a/2', 'https://a/x')
+        cache.resolve('https://a/1', 1)
+        cache.add('https://a/3', 'https://a/x')
+        self.assertEqual(cache.resolve('https://a/2', 1), 'https://a/2')
+        self.assertEqual(cache.resolve('https://a/1', 1), 'https://a/x')
+
+
+class TestSession(unittest.TestCase):
+
+    def setUp(self):
+        self.session = Session(ConnectionPool(), headers={'User-Agent': 'test'}, timeout=1,
+                               redirect_cache=RedirectCache())
+        self.addCleanup(self.session.close)
+        self.servers = {}
+        patcher = patch('requests.session.connect', side_effect=self.connect)
+        self.mock_connect = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def connect(self, host, port, timeout, verify, cafile, timings=None, scheme=None, resolver=None):
+        client, server = socket.socketpair()
+        client.settimeout(1)
+        self.addCleanup(server.close)
+        self.servers[host] = server
+        return client
+
+    def exchange(self, url, *responses, **kwargs):
+        # Each response is written once its request has arrived, as a real server would.
+        requests = []
+
+        def answer():
+            self.wait_for(host)
+            for response in responses:
+                requests.append(self.servers[host].recv(4096))
+                self.servers[host].sendall(response)
+
+        host = url.split('/')[2]
+        thread = threading.Thread(target=answer)
+        thread.start()
+        result = self.session.get(url, **kwargs)
+        thread.join()
+        return (result, *requests)
+
+    def wait_for(self, host):
+        while host not in self.servers:
+            time.sleep(0.001)
+
+    def test_session_reuses_connection_and_keeps_cookies(self):
+        _, first = self.exchange("https://example.com/login",
+                                 b"HTTP/1.1 200 OK\r\nSet-Cookie: sid=42\r\nContent-Length: 0\r\n\r\n")
+        response, second = self.exchange("https://example.com/me", b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok",
+                                         cookies={'lang': 'en'})
+
+        self.assertEqual(response.content, b"ok")
+        self.assertNotIn(b"Cookie", first)
+        self.assertIn(b"User-Agent: test\r\n", second)
+        self.assertIn(b"Cookie: sid=42; lang=en\r\n", second)
+        self.mock_connect.assert_called_once_with("example.com", 443, ANY, True, None, ANY, "https",
+                                                  resolver=self.session.resolver)
+
+    def test_pipeline_sends_same_origin_requests_on_one_connection(self):
+        received = []
+
+        def answer():
+            self.wait_for("example.com")
+            data = b""
+            while data.count(b"\r\n\r\n") < 3:
+                data += self.servers["example.com"].recv(4096)
+            received.append(data)
+            self.servers["example.com"].sendall(b"".join(
+                b"HTTP/1.1 200 OK\r\nContent-Length: 1\r\n\r\n%d" % i for i in range(3)
+            ))
+
+        thread = threading.Thread(target=answer)
+        thread.start()
+        responses = self.session.pipeline(["https://example.com/%d" % i for i in range(3)])
+        thread.join()
+
+        self.assertEqual([response.content for response in responses], [b"0", b"1", b"2"])
+        self.assertEqual([line for line in received[0].split(b"\r\n") if line.startswith(b"GET")],
+                         [b"GET /0 HTTP/1.1", b"GET /1 HTTP/1.1", b"GET /2 HTTP/1.1"])
+        self.mock_connect.assert_called_once()
+
+    def test_session_cookies_stay_with_their_host(self):
+        self.exchange("https://example.com/", b"HTTP/1.1 200 OK\r\nSet-Cookie: sid=42\r\nContent-Length: 0\r\n\r\n")
+        _, request = self.exchange("https://other.com/", b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n")
+        self.assertNotIn(b"sid=42", request)
+
+
+    def test_redirect_reuses_connection_and_is_cached(self):
+        response, first, second = self.exchange(
+            "https://example.com/old",
+            b"HTTP/1.1 301 Moved Permanently\r\nLocation: /new\r\nContent-Length: 5\r\n\r\nmoved",
+            b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok",
+            stream=True
+        )
+        self.assertEqual(response.content, b"ok")
+        self.assertTrue(second.startswith(b"GET /new HTTP/1.1"))
+        self.assertEqual(self.mock_connect.call_count, 1)
+
+        _, third = self.exchange("https://example.com/old", b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+        self.assertTrue(third.startswith(b"GET /new HTTP/1.1"))
+
+    def test_temporary_redirect_is_not_cached(self):
+        self.exchange(
+            "https://example.com/old",
+            b"HTTP/1.1 302 Found\r\nLocation: /new\r\nContent-Length: 0\r\n\r\n",
+            b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n"
+        )
+        self.assertEqual(self.session.redirect_cache.resolve("https://example.com/old", 5), "https://example.com/old")
+
+
+OK = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok"
+
+
+class TestTransports(unittest.TestCase):
+
+    def setUp(self):
+        self.session = Session(ConnectionPool(), timeout=1, redirect_cache=RedirectCache())
+        self.addCleanup(self.session.close)
+        self.requests = []
+
+    def listen(self, listener, *responses):
+        self.addCleanup(listener.close)
+        listener.listen()
+
+        def answer():
+            for response in responses or [OK]:
+                conn, _ = listener.accept()
+                with conn:
+                    self.requests.append(conn.recv(4096))
+                    conn.sendall(response)
+
+        thread = threading.Thread(target=answer)
+        thread.start()
+        self.addCleanup(thread.join)
+
+    def test_plain_http_on_explicit_port(self):
+        listener = socket.create_server(('127.0.0.1', 0))
+        port = listener.getsockname()[1]
+        self.listen(listener)
+        response = self.session.get(f'http://127.0.0.1:{port}/status')
+        self.assertEqual(response.content, b"ok")
+        self.assertIn(f"Host: 127.0.0.1:{port}\r\n".encode(), self.requests[0])
+        self.assertIsNone(response.timings.tls)
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix domain sockets are not available')
+    def test_unix_socket(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'Service.sock')
+        self.addCleanup(os.rmdir, directory)
+        self.addCleanup(os.unlink, path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        self.listen(listener)
+        response = self.session.get(f'http+unix://{quote(path, safe="")}/status')
+        self.assertEqual(response.content, b"ok")
+        self.assertTrue(self.requests[0].startswith(b"GET /status HTTP/1.1\r\nHost: localhost\r\n"))
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix domain sockets are not available')
+    def test_unix_socket_relative_redirect(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'Service.sock')
+        self.addCleanup(os.rmdir, directory)
+        self.addCleanup(os.unlink, path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        self.listen(listener, b"HTTP/1.1 302 Found\r\nLocation: /new\r\nContent-Length: 0\r\nConnection: close\r\n\r\n",
+                    OK)
+        response = self.session.get(f'http+unix://{quote(path, safe="")}/old')
+        self.assertEqual(response.content, b"ok")
+        self.assertTrue(self.requests[1].startswith(b"GET /new HTTP/1.1\r\n"))
+
+
+if __name__ == '__main__':
+    unittest.main()
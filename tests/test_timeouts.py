@@ -0,0 +1,62 @@
+import socket
+import time
+import unittest
+from unittest.mock import patch
+from exceptions import TimeoutError
+from requests.pool import ConnectionPool
+from requests.session import Session, connect
+from requests.timeouts import Timeout, Deadline, as_deadline
+
+
+class TestTimeouts(unittest.TestCase):
+
+    def test_number_applies_to_every_phase(self):
+        deadline = as_deadline(5)
+        self.assertEqual([deadline.limit(phase) for phase in ('connect', 'tls', 'write', 'read')], [5] * 4)
+        self.assertIsNone(deadline.expires)
+        self.assertIs(as_deadline(deadline), deadline)
+
+    def test_tls_defaults_to_connect(self):
+        self.assertEqual(Timeout(connect=3).tls, 3)
+        self.assertEqual(Timeout(connect=3, tls=7).tls, 7)
+
+    def test_total_caps_phase_limits(self):
+        deadline = Timeout(connect=10, read=None, total=1).start()
+        self.assertLessEqual(deadline.limit('connect'), 1)
+        self.assertLessEqual(deadline.limit('read'), 1)
+
+    def test_expired_total_raises_total_phase(self):
+        deadline = Deadline(Timeout(read=10, total=0))
+        with self.assertRaises(TimeoutError) as context:
+            deadline.limit('read')
+        self.assertEqual(context.exception.phase, 'total')
+
+    def test_phase_error(self):
+        error = as_deadline(Timeout(read=2)).error('read')
+        self.assertEqual(error.phase, 'read')
+        self.assertIn('read', error.message)
+
+    @patch('requests.session.dns.create_connection', side_effect=socket.timeout())
+    def test_connect_phase(self, mock_create_connection):
+        with self.assertRaises(TimeoutError) as context:
+            connect('example.com', 443, Timeout(connect=0.5, read=30))
+        self.assertEqual(context.exception.phase, 'connect')
+        self.assertEqual(mock_create_connection.call_args[0][2], 0.5)
+
+    def test_total_deadline_stops_a_trickling_response(self):
+        client, server = socket.socketpair()
+        self.addCleanup(server.close)
+        server.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\nstarted")
+        session = Session(ConnectionPool())
+        self.addCleanup(session.close)
+
+        started = time.monotonic()
+        with patch('requests.session.connect', return_value=client):
+            with self.assertRaises(TimeoutError) as context:
+                session.get('https://example.com/', timeout=Timeout(connect=1, read=5, total=0.1))
+        self.assertEqual(context.exception.phase, 'total')
+        self.assertLess(time.monotonic() - started, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
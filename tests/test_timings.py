@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import patch
+from requests.pool import ConnectionPool
+from requests.session import Session, RedirectCache
+from tests.helpers import serve_in_thread
+from requests.timings import Timings
+
+
+class TestTimings(unittest.TestCase):
+
+    def test_format(self):
+        timings = Timings()
+        timings.ttfb = 0.25
+        timings.bytes_received = 42
+        timings.reused = True
+        self.assertEqual(timings.format("%{ttfb} %{tls} %{bytes_received} %{reused}\\n"), "0.250000 0.000000 42 1\n")
+
+    def test_phases(self):
+        timings = Timings()
+        timings.sent(timings.started)
+        timings.first_byte()
+        timings.first_byte()
+        timings.finished(100)
+        self.assertGreaterEqual(timings.write, 0)
+        self.assertGreaterEqual(timings.ttfb, 0)
+        self.assertGreaterEqual(timings.total, timings.ttfb)
+        self.assertEqual(timings.bytes_received, 100)
+
+
+class TestSessionTimings(unittest.TestCase):
+
+    def setUp(self):
+        self.session = Session(ConnectionPool(), timeout=1, redirect_cache=RedirectCache())
+        self.addCleanup(self.session.close)
+
+    def test_response_carries_timings(self):
+        client = serve_in_thread(self, b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nHello",
+                                 b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n")
+        with patch('requests.session.connect', return_value=client):
+            first = self.session.get('https://example.com/')
+            second = self.session.get('https://example.com/')
+
+        self.assertFalse(first.timings.reused)
+        self.assertTrue(second.timings.reused)
+        self.assertEqual(first.timings.bytes_received, 43)
+        self.assertEqual(first.timings.bytes_sent, len(
+            b"GET / HTTP/1.1\r\nHost: example.com\r\nConnection: keep-alive\r\nAccept-Encoding: gzip, deflate\r\n\r\n"
+        ))
+        for field in ('write', 'ttfb', 'transfer', 'total'):
+            self.assertIsNotNone(getattr(first.timings, field), field)
+
+    def test_streamed_body_finishes_timings(self):
+        client = serve_in_thread(self, b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nHello")
+        with patch('requests.session.connect', return_value=client):
+            response = self.session.get('https://example.com/', stream=True)
+            self.assertEqual(response.content, b"Hello")
+        self.assertEqual(response.timings.bytes_received, 43)
+        self.assertIsNotNone(response.timings.total)
+
+    def test_redirects_are_counted(self):
+        client = serve_in_thread(self, b"HTTP/1.1 302 Found\r\nLocation: /b\r\nContent-Length: 0\r\n\r\n",
+                                 b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n")
+        with patch('requests.session.connect', return_value=client):
+            response = self.session.get('https://example.com/a')
+        self.assertEqual(response.timings.redirects, 1)
+        self.assertTrue(response.timings.reused)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import ssl
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from requests import tls
+
+
+class TestTLS(unittest.TestCase):
+
+    def setUp(self):
+        tls.clear()
+        self.addCleanup(tls.clear)
+
+    @patch('ssl.create_default_context')
+    def test_get_context_is_cached_per_configuration(self, mock_create_default_context):
+        mock_create_default_context.side_effect = lambda cafile=None: MagicMock()
+        context = tls.get_context()
+        self.assertIs(tls.get_context(), context)
+        self.assertIsNot(tls.get_context(verify=False), context)
+        self.assertIsNot(tls.get_context(alpn_protocols=['http/1.1']), context)
+        self.assertEqual(mock_create_default_context.call_count, 3)
+
+    def test_get_context_without_verification(self):
+        context = tls.get_context(verify=False)
+        self.assertFalse(context.check_hostname)
+        self.assertEqual(context.verify_mode, ssl.CERT_NONE)
+
+    def make_session(self, lifetime=300):
+        session = MagicMock(spec=ssl.SSLSession)
+        session.time = int(time.time())
+        session.timeout = lifetime
+        return session
+
+    def test_session_is_resumed_only_by_its_context(self):
+        context = MagicMock()
+        session = self.make_session()
+        tls.save_session('example.com', 443, MagicMock(context=context, session=session))
+        self.assertIs(tls.get_session('example.com', 443, context), session)
+        self.assertIsNone(tls.get_session('example.com', 443, MagicMock()))
+        self.assertIsNone(tls.get_session('example.org', 443, context))
+
+    def test_expired_session_is_dropped(self):
+        context = MagicMock()
+        tls.save_session('example.com', 443, MagicMock(context=context, session=self.make_session(lifetime=-1)))
+        self.assertIsNone(tls.get_session('example.com', 443, context))
+
+    @patch('requests.tls.MAX_SESSIONS', 2)
+    def test_session_store_is_bounded(self):
+        context = MagicMock()
+        for host in ('a.example', 'b.example', 'c.example'):
+            tls.save_session(host, 443, MagicMock(context=context, session=self.make_session()))
+        self.assertIsNone(tls.get_session('a.example', 443, context))
+        self.assertIsNotNone(tls.get_session('c.example', 443, context))
+
+    def test_config_key(self):
+        self.assertIsNone(tls.config_key())
+        self.assertEqual(tls.config_key(False), (False, None))
+        self.assertEqual(tls.config_key(cafile='ca.pem'), (True, 'ca.pem'))
+
+    def test_wrap_socket_passes_stored_session(self):
+        context = MagicMock()
+        session = self.make_session()
+        tls.save_session('example.com', 443, MagicMock(context=context, session=session))
+        sock = MagicMock()
+        tls.wrap_socket(sock, 'example.com', 443, context)
+        context.wrap_socket.assert_called_once_with(sock, server_hostname='example.com', session=session)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import gzip
+import io
+import socket
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from exceptions import ConnectionError, RedirectError
+from requests.pool import ConnectionPool
+from requests.session import Session, RedirectCache, encode_body
+from requests.upload import UploadBody, MAX_INLINE_BODY
+
+OK = b"HTTP/1.1 204 No Content\r\n\r\n"
+
+
+def dechunk(body):
+    data = b""
+    while True:
+        size, _, body = body.partition(b"\r\n")
+        size = int(size, 16)
+        if not size:
+            return data
+        data += body[:size]
+        body = body[size + 2:]
+
+
+class TestUploadBody(unittest.TestCase):
+
+    def test_lengths(self):
+        self.assertEqual(UploadBody(bytearray(b"abc")).length, 3)
+        self.assertEqual(UploadBody(memoryview(b"abcd")).length, 4)
+        file = io.BytesIO(b"skip-payload")
+        file.seek(5)
+        self.assertEqual(UploadBody(file).length, 7)
+        self.assertTrue(UploadBody(iter([b"a"])).chunked)
+        self.assertTrue(UploadBody(io.StringIO("text")).chunked)
+
+    def test_chunked_frames(self):
+        body = UploadBody(iter([b"abc", b"", "defghijklmnopq"]))
+        self.assertEqual(b"".join(body.frames()), b"3\r\nabc\r\ne\r\ndefghijklmnopq\r\n0\r\n\r\n")
+
+    def test_iterator_is_not_replayable(self):
+        body = UploadBody(iter([b"abc"]))
+        self.assertFalse(body.replayable)
+        list(body.frames())
+        with self.assertRaises(ConnectionError):
+            list(body.frames())
+
+    def test_file_is_rewound(self):
+        body = UploadBody(io.BytesIO(b"payload"))
+        self.assertEqual(b"".join(body.frames()), b"payload")
+        self.assertEqual(b"".join(body.frames()), b"payload")
+
+    def test_short_file(self):
+        body = UploadBody(io.BytesIO(b"payload"))
+        body.data = io.BytesIO(b"pay")
+        with self.assertRaises(ConnectionError):
+            list(body.frames())
+
+
+class TestStreamingUpload(unittest.TestCase):
+
+    def setUp(self):
+        self.client, self.server = socket.socketpair()
+        self.client.settimeout(1)
+        self.server.settimeout(1)
+        self.addCleanup(self.server.close)
+        self.session = Session(ConnectionPool(), timeout=1, redirect_cache=RedirectCache(), decode_content=False)
+        self.addCleanup(self.session.close)
+        patcher = patch('requests.session.connect', return_value=self.client)
+        self.connect = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.data = []
+        self.reader = threading.Thread(target=self.read)
+        self.reader.start()
+
+    def read(self):
+        # Bodies larger than the socket buffer are only sent while someone reads them.
+        while chunk := self.server.recv(65536):
+            self.data.append(chunk)
+
+    def received(self):
+        self.client.shutdown(socket.SHUT_WR)
+        self.reader.join()
+        head, _, body = b"".join(self.data).partition(b"\r\n\r\n")
+        return head + b"\r\n", body
+
+    def test_file(self):
+        self.server.sendall(OK)
+        with tempfile.TemporaryFile() as file:
+            file.write(b"x" * 100000)
+            file.seek(0)
+            response = self.session.put('https://example.com/upload', file)
+        head, body = self.received()
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response.timings.bytes_sent, len(head) + 2 + 100000)
+        self.assertIn(b"Content-Length: 100000\r\n", head)
+        self.assertEqual(body, b"x" * 100000)
+
+    def test_large_bytes_are_not_joined_to_the_head(self):
+        self.server.sendall(OK)
+        data = b"y" * (MAX_INLINE_BODY + 1)
+        self.assertIsInstance(encode_body('POST', data), UploadBody)
+        self.session.post('https://example.com/upload', data)
+        head, body = self.received()
+        self.assertIn(b"Content-Length: %d\r\n" % len(data), head)
+        self.assertEqual(body, data)
+
+    def test_generator_is_sent_chunked(self):
+        self.server.sendall(OK)
+        self.session.post('https://example.com/upload', (b"line %d\n" % i for i in range(3)))
+        head, body = self.received()
+        self.assertIn(b"Transfer-Encoding: chunked\r\n", head)
+        self.assertNotIn(b"Content-Length", head)
+        self.assertEqual(dechunk(body), b"line 0\nline 1\nline 2\n")
+
+    def test_compressed_stream(self):
+        self.server.sendall(OK)
+        self.session.put('https://example.com/upload', io.BytesIO(b"log line\n" * 1000), compress='gzip')
+        head, body = self.received()
+        self.assertIn(b"Content-Encoding: gzip\r\n", head)
+        self.assertIn(b"Transfer-Encoding: chunked\r\n", head)
+        self.assertEqual(gzip.decompress(dechunk(body)), b"log line\n" * 1000)
+
+    def test_redirect_cannot_resend_generator(self):
+        self.server.sendall(b"HTTP/1.1 307 Temporary Redirect\r\nLocation: /other\r\nContent-Length: 0\r\n\r\n")
+        with self.assertRaises(RedirectError):
+            self.session.post('https://example.com/upload', iter([b"data"]))
+        self.received()
+
+
+if __name__ == '__main__':
+    unittest.main()